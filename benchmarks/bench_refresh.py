@@ -0,0 +1,450 @@
+"""Fleet-scale refresh benchmark against a local stand-in PocketBase hub.
+
+Starts a mock hub in a separate process serving N synthetic systems, then
+drives ``BeszelCoordinator`` and ``BeszelStatsCoordinator`` refreshes through
+the native client and reads every sensor the integration would create.
+Reports per refresh wall time, CPU time of the integration process, request
+count and response bytes on the wire (gzip compressed unless
+``--no-compress`` is given).
+
+Run from the repository root with Home Assistant installed::
+
+    python benchmarks/bench_refresh.py --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MINUTE = timedelta(minutes=1)
+FILTER_RE = re.compile(r"(\w+)\s*(>=|=)\s*'([^']*)'")
+
+
+def _pb_time(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+def _token():
+    """Unsigned JWT that the client reads as valid for a year."""
+    def part(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+    return f"{part({'alg': 'none'})}.{part({'exp': int(time.time()) + 365 * 86400})}.bench"
+
+
+# ---- Synthetic fleet ----
+
+def _system_info(rnd, i):
+    return {
+        "h": f"host-{i}",
+        "k": "6.8.0-45-generic",
+        "c": 8,
+        "t": 16,
+        "m": "Intel(R) Core(TM) i7-12700",
+        "v": "0.12.1",
+        "u": rnd.randint(60, 10**6),
+        "cpu": round(rnd.uniform(0, 100), 2),
+        "mp": round(rnd.uniform(10, 90), 2),
+        "dp": round(rnd.uniform(10, 90), 2),
+        "b": round(rnd.uniform(0, 50), 2),
+        "dt": round(rnd.uniform(30, 80), 1),
+        "os": 0,
+        "l1": 0.42, "l5": 0.36, "l15": 0.3,
+    }
+
+
+def _system_stats(rnd, i, gpu):
+    stats = {
+        "cpu": round(rnd.uniform(0, 100), 2),
+        "m": 31.2, "mu": round(rnd.uniform(2, 28), 2), "mp": round(rnd.uniform(10, 90), 2),
+        "mb": 1.1, "mz": 0.2, "s": 8, "su": 0.1,
+        "d": 931.5, "du": round(rnd.uniform(100, 900), 2), "dp": round(rnd.uniform(10, 90), 2),
+        "dr": round(rnd.uniform(0, 20), 2), "dw": round(rnd.uniform(0, 20), 2),
+        "ns": round(rnd.uniform(0, 5), 2), "nr": round(rnd.uniform(0, 5), 2),
+        "t": {
+            "cpu_thermal": round(rnd.uniform(35, 80), 1),
+            "acpitz": 27.8,
+            "nvme_composite": round(rnd.uniform(30, 60), 1),
+            "coretemp_package_id_0": round(rnd.uniform(35, 80), 1),
+            "coretemp_core_0": round(rnd.uniform(35, 80), 1),
+            "coretemp_core_4": round(rnd.uniform(35, 80), 1),
+        },
+        "efs": {
+            disk: {
+                "d": 3726.0,
+                "du": round(rnd.uniform(100, 3500), 2),
+                "r": round(rnd.uniform(0, 50), 2),
+                "w": round(rnd.uniform(0, 50), 2),
+            }
+            for disk in ("sdb1", "nvme1n1p1")
+        },
+    }
+    if gpu:
+        stats["t"]["gpu_temp"] = round(rnd.uniform(35, 80), 1)
+        stats["g"] = {
+            "0": {
+                "n": "Intel Arc A380",
+                "u": round(rnd.uniform(0, 100), 2),
+                "p": round(rnd.uniform(2, 35), 2),
+                "mu": round(rnd.uniform(100, 5000), 1),
+                "mt": 6144.0,
+                "e": {
+                    "Render/3D": round(rnd.uniform(0, 100), 2),
+                    "Blitter": round(rnd.uniform(0, 5), 2),
+                    "Video": round(rnd.uniform(0, 60), 2),
+                    "VideoEnhance": round(rnd.uniform(0, 20), 2),
+                },
+            }
+        }
+        stats["pd"] = {"gt": round(rnd.uniform(2, 35), 2), "package": round(rnd.uniform(10, 90), 2)}
+    return stats
+
+
+def _container_stats(rnd, containers):
+    return [
+        {
+            "n": f"{('web', 'db', 'cache', 'worker')[c % 4]}-{c}",
+            "c": round(rnd.uniform(0, 50), 2),
+            "m": round(rnd.uniform(20, 2000), 1),
+            "ns": round(rnd.uniform(0, 2), 3),
+            "nr": round(rnd.uniform(0, 2), 3),
+        }
+        for c in range(containers)
+    ]
+
+
+class Fleet:
+    """In-memory ``systems``, ``system_stats`` and ``container_stats`` collections of the mock hub."""
+
+    def __init__(self, size, history, gpu_ratio, containers=0, seed=1):
+        self.rnd = random.Random(seed)
+        self.size = size
+        self.gpu_ratio = gpu_ratio
+        self.containers = containers
+        self.now = datetime.now(timezone.utc) - history * MINUTE
+        self.systems = {}
+        # Newest first, as the client always sorts on -created
+        self.stats = []
+        self.container_stats = []
+        for i in range(size):
+            sid = f"sys{i:06d}"
+            self.systems[sid] = {
+                "id": sid,
+                "collectionId": "2hz5ncl8tizk5nx",
+                "collectionName": "systems",
+                "name": f"host-{i}",
+                "host": f"10.0.{i // 250}.{i % 250 + 1}",
+                "port": "45876",
+                "status": "down" if i % 20 == 19 else "up",
+                "users": ["bench"],
+                "created": _pb_time(self.now),
+                "updated": _pb_time(self.now),
+                "info": _system_info(self.rnd, i),
+            }
+        for _ in range(history):
+            self.tick()
+
+    def tick(self):
+        """Advance the hub one minute: every agent reports info and a 1m stats record.
+
+        Every ten minutes a 10m record is written as well, like Beszel does.
+        """
+        self.now += MINUTE
+        stamp = _pb_time(self.now)
+        batch = []
+        for i, (sid, system) in enumerate(self.systems.items()):
+            if system["status"] != "up":
+                continue
+            system["info"] = _system_info(self.rnd, i)
+            system["updated"] = stamp
+            batch.append({
+                "id": f"st{len(self.stats) + len(batch):09d}",
+                "collectionId": "ej9oowivz8b2mht",
+                "collectionName": "system_stats",
+                "system": sid,
+                "type": "1m",
+                "created": stamp,
+                "updated": stamp,
+                "stats": _system_stats(self.rnd, i, i < self.size * self.gpu_ratio),
+            })
+        if self.now.minute % 10 == 0:
+            # Downsampled series the client must skip
+            batch += [{**record, "id": f"{record['id']}a", "type": "10m"} for record in batch]
+        self.stats[:0] = reversed(batch)
+        if self.containers:
+            self.container_stats[:0] = [
+                {
+                    "id": f"ct{record['id'][2:]}",
+                    "collectionName": "container_stats",
+                    "system": record["system"],
+                    "type": record["type"],
+                    "created": stamp,
+                    "updated": stamp,
+                    "stats": _container_stats(self.rnd, self.containers),
+                }
+                for record in reversed(batch)
+            ]
+
+
+def _project(item, fields):
+    """Apply a PocketBase ``fields`` list, including dotted paths into JSON fields."""
+    if not fields:
+        return item
+    out = {}
+    for path in fields.split(","):
+        src, dst = item, out
+        keys = path.split(".")
+        for key in keys[:-1]:
+            src = src.get(key) if isinstance(src, dict) else None
+            if not isinstance(src, dict):
+                break
+            dst = dst.setdefault(key, {})
+        else:
+            if isinstance(src, dict) and keys[-1] in src:
+                dst[keys[-1]] = src[keys[-1]]
+    return out
+
+
+def _matches(item, conditions):
+    for field, op, value in conditions:
+        have = item.get(field)
+        if op == "=" and have != value:
+            return False
+        if op == ">=" and (have is None or have < value):
+            return False
+    return True
+
+
+# ---- Mock hub (runs in its own process so it does not skew CPU time) ----
+
+def _run_hub(size, history, gpu_ratio, containers, compress, port_queue):
+    import gzip
+    from aiohttp import web
+
+    fleet = Fleet(size, history, gpu_ratio, containers)
+    counters = {"requests": 0, "bytes": 0}
+
+    @web.middleware
+    async def count(request, handler):
+        response = await handler(request)
+        if not request.path.startswith("/_bench"):
+            # Compressed like a hub behind a gzip-enabled reverse proxy
+            if compress and "gzip" in request.headers.get("Accept-Encoding", ""):
+                response.body = gzip.compress(response.body, 6)
+                response.headers["Content-Encoding"] = "gzip"
+            counters["requests"] += 1
+            counters["bytes"] += len(response.body or b"")
+        return response
+
+    def json_response(data):
+        return web.Response(body=json.dumps(data, separators=(",", ":")).encode(),
+                            content_type="application/json")
+
+    async def auth(request):
+        return json_response({"token": _token(), "record": {"id": "bench"}})
+
+    async def records(request):
+        collection = request.match_info["collection"]
+        query = request.query
+        items = {
+            "systems": lambda: list(fleet.systems.values()),
+            "system_stats": lambda: fleet.stats,
+            "container_stats": lambda: fleet.container_stats,
+        }[collection]()
+        conditions = FILTER_RE.findall(query.get("filter", ""))
+        if conditions:
+            items = [item for item in items if _matches(item, conditions)]
+        if query.get("sort") == "-created" and collection == "systems":
+            items = sorted(items, key=lambda item: item["created"], reverse=True)
+        page, per_page = int(query.get("page", 1)), int(query.get("perPage", 30))
+        items = items[(page - 1) * per_page:page * per_page]
+        return json_response({
+            "page": page,
+            "perPage": per_page,
+            "items": [_project(item, query.get("fields")) for item in items],
+        })
+
+    async def bench_tick(request):
+        fleet.tick()
+        return json_response({})
+
+    async def bench_counters(request):
+        data = dict(counters)
+        if request.query.get("reset"):
+            counters.update(requests=0, bytes=0)
+        return json_response(data)
+
+    app = web.Application(middlewares=[count])
+    app.router.add_post("/api/collections/users/auth-with-password", auth)
+    app.router.add_post("/api/collections/users/auth-refresh", auth)
+    app.router.add_get("/api/collections/{collection}/records", records)
+    app.router.add_post("/_bench/tick", bench_tick)
+    app.router.add_get("/_bench/counters", bench_counters)
+
+    async def serve():
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port_queue.put(site._server.sockets[0].getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+# ---- Integration side ----
+
+async def _bench_size(size, args):
+    import aiohttp
+    from homeassistant.core import HomeAssistant
+    from custom_components.beszel_api.api import BeszelAsyncApiClient
+    from custom_components.beszel_api.const import SENSOR_FAMILIES, CONF_STATS_TYPE, DEFAULT_STATS_TYPE
+    from custom_components.beszel_api.coordinator import BeszelCoordinator, BeszelStatsCoordinator
+    from custom_components.beszel_api.metrics import BeszelMetrics
+    from custom_components.beszel_api.sensor import _new_entities
+    from custom_components.beszel_api.binary_sensor import BeszelStatusBinarySensor
+
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    hub = ctx.Process(target=_run_hub, args=(size, args.history, args.gpu_ratio, args.containers, args.compress, port_queue), daemon=True)
+    hub.start()
+    url = f"http://127.0.0.1:{port_queue.get(timeout=120)}"
+
+    hass = HomeAssistant(tempfile.mkdtemp(prefix="beszel-bench-"))
+    entry = SimpleNamespace(entry_id="bench", data={}, options=dict(args.options))
+    rows = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            # Wired like async_setup_entry, so the instrumentation overhead is included
+            metrics = BeszelMetrics()
+            client = BeszelAsyncApiClient(
+                session,
+                url,
+                "bench@example.com",
+                "bench",
+                metrics=metrics,
+                stats_type=entry.options.get(CONF_STATS_TYPE, DEFAULT_STATS_TYPE),
+            )
+            coordinator = BeszelCoordinator(hass, entry, client, metrics=metrics)
+            stats_coordinator = BeszelStatsCoordinator(hass, entry, client, coordinator, metrics=metrics)
+            entities = []
+            known = set()
+            families = {family for family in SENSOR_FAMILIES if entry.options.get(family, True)}
+
+            async def counters(reset=True):
+                async with session.get(f"{url}/_bench/counters", params={"reset": "1"} if reset else {}) as resp:
+                    return await resp.json()
+
+            for round_no in range(args.rounds + 1):
+                if round_no:
+                    async with session.post(f"{url}/_bench/tick"):
+                        pass
+                    if args.all_due:
+                        # Worst case: every system is due for stats on every refresh
+                        stats_coordinator._stats_due.clear()
+                await counters()
+                cpu, wall = time.process_time(), time.perf_counter()
+                await coordinator.async_refresh()
+                await stats_coordinator.async_refresh()
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                if not (coordinator.last_update_success and stats_coordinator.last_update_success):
+                    raise RuntimeError(f"refresh against the mock hub failed at {size} hosts")
+                hub_counters = await counters()
+
+                # Discovery as the platforms would do it; new entities register their fields
+                new = _new_entities(coordinator, stats_coordinator, known, families)
+                for system in coordinator.data["systems"].values():
+                    if ("binary", system.id) not in known:
+                        known.add(("binary", system.id))
+                        new.append(BeszelStatusBinarySensor(coordinator, system))
+                for entity in new:
+                    coordinator.async_register_fields(entity.unique_id, entity._system_fields, entity._stats_fields)
+                entities.extend(new)
+
+                # The property paths Home Assistant reads when entities are written
+                entity_time = time.perf_counter()
+                for entity in entities:
+                    entity._state_snapshot()
+                    entity.device_info
+                entity_time = time.perf_counter() - entity_time
+
+                rows.append({
+                    "round": "cold" if round_no == 0 else "warm",
+                    "wall": wall,
+                    "cpu": cpu,
+                    "requests": hub_counters["requests"],
+                    "bytes": hub_counters["bytes"],
+                    "entities": len(entities),
+                    "entity_time": entity_time,
+                })
+            if args.json:
+                rows.append({"round": "metrics", **metrics.as_dict()})
+            await stats_coordinator.async_shutdown()
+            await coordinator.async_shutdown()
+    finally:
+        hub.terminate()
+        hub.join()
+    return rows
+
+
+def _summary(size, rows):
+    lines = []
+    for kind in ("cold", "warm"):
+        sel = [row for row in rows if row["round"] == kind]
+        if not sel:
+            continue
+        def med(key):
+            return statistics.median(row[key] for row in sel)
+        lines.append(
+            f"{size:>6} {kind:<5} {len(sel):>3} {med('wall') * 1000:>10.1f} {med('cpu') * 1000:>10.1f} "
+            f"{med('requests'):>9.0f} {med('bytes') / 1024:>11.1f} {sel[-1]['entities']:>9} "
+            f"{med('entity_time') * 1000:>11.2f}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=5, help="warm refreshes after the cold one")
+    parser.add_argument("--history", type=int, default=10, help="minutes of 1m stats kept by the hub")
+    parser.add_argument("--gpu-ratio", type=float, default=0.5, help="share of systems with a GPU")
+    parser.add_argument("--no-all-due", dest="all_due", action="store_false",
+                        help="keep the adaptive stats schedule instead of fetching every system each round")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=JSON",
+                        help="config entry option, e.g. --option max_concurrency=16")
+    parser.add_argument("--containers", type=int, default=12,
+                        help="containers per host in container_stats (read with --option container_include=...)")
+    parser.add_argument("--no-compress", dest="compress", action="store_false",
+                        help="serve responses uncompressed even when gzip is accepted")
+    parser.add_argument("--json", action="store_true", help="print raw rows as JSON")
+    args = parser.parse_args()
+    args.options = {key: json.loads(value) for key, value in (o.split("=", 1) for o in args.option)}
+
+    results = {}
+    for size in args.sizes:
+        results[size] = asyncio.run(_bench_size(size, args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'hosts':>6} {'kind':<5} {'n':>3} {'wall ms':>10} {'cpu ms':>10} {'requests':>9} "
+          f"{'KiB recv':>11} {'entities':>9} {'entity ms':>11}")
+    for size, rows in results.items():
+        print("\n".join(_summary(size, rows)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,141 @@
-import asyncio
 from datetime import timedelta
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from .const import DOMAIN, CONF_URL, CONF_USERNAME, CONF_PASSWORD, UPDATE_INTERVAL, LOGGER
-from .api import BeszelApiClient
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from .const import (
+    DOMAIN, CONF_URL, CONF_USERNAME, CONF_PASSWORD, CONF_USE_SDK, CONF_BACKFILL,
+    CONF_STATS_TYPE, DEFAULT_STATS_TYPE, CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT,
+    BACKFILL_INTERVAL, STORAGE_VERSION, LOGGER,
+)
+from .api import BeszelApiClient, BeszelAsyncApiClient, BeszelSdkAsyncClient
+from .backfill import BeszelBackfill
+from .coordinator import BeszelCoordinator, BeszelStatsCoordinator
+from .metrics import BeszelMetrics
 
 PLATFORMS = ["sensor", "binary_sensor"]
 
+def _auth_key(entry):
+    return f"{DOMAIN}.{entry.entry_id}.auth"
+
+def _snapshot_key(entry):
+    return f"{DOMAIN}.{entry.entry_id}.snapshot"
+
+def _backfill_key(entry):
+    return f"{DOMAIN}.{entry.entry_id}.backfill"
+
 async def async_setup_entry(hass, entry):
     hass.data.setdefault(DOMAIN, {})
 
     url = entry.data[CONF_URL]
     username = entry.data.get(CONF_USERNAME, None)
     password = entry.data.get(CONF_PASSWORD, None)
-    client = BeszelApiClient(url, username, password)
+    metrics = BeszelMetrics()
+    stats_type = entry.options.get(CONF_STATS_TYPE, DEFAULT_STATS_TYPE)
+    request_timeout = entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)
+    if entry.options.get(CONF_USE_SDK, entry.data.get(CONF_USE_SDK, False)):
+        # Fallback: the synchronous SDK, run on the executor
+        client = BeszelSdkAsyncClient(
+            BeszelApiClient(
+                url, username, password, stats_type=stats_type, request_timeout=request_timeout
+            ),
+            hass.async_add_executor_job,
+        )
+    else:
+        client = BeszelAsyncApiClient(
+            async_get_clientsession(hass),
+            url,
+            username,
+            password,
+            token_store=Store(hass, STORAGE_VERSION, _auth_key(entry)),
+            metrics=metrics,
+            stats_type=stats_type,
+            request_timeout=request_timeout,
+        )
 
-    async def async_update_data():
-        try:
-            systems = await hass.async_add_executor_job(client.get_systems)
-
-            if not systems:
-                LOGGER.warning("No systems found in Beszel API")
-                return {"systems": [], "stats": {}}
-
-            # Create a stats dictionary to store stats by system ID
-            stats_data = {}
-
-            # Fetch system stats for each system
-            for system in systems:
-                try:
-                    stats = await hass.async_add_executor_job(client.get_system_stats, system.id)
-                    if stats:
-                        # Store stats in the stats dictionary
-                        stats_data[system.id] = stats.stats if hasattr(stats, 'stats') else {}
-                    else:
-                        stats_data[system.id] = {}
-                except Exception as e:
-                    LOGGER.warning(f"Failed to fetch stats for system {system.id}: {e}")
-                    stats_data[system.id] = {}
-
-            return {"systems": systems, "stats": stats_data}
-        except Exception as err:
-            LOGGER.error(f"Error fetching systems: {err}")
-            raise UpdateFailed(f"Error fetching systems: {err}")
-
-    coordinator = DataUpdateCoordinator(
+    coordinator = BeszelCoordinator(
         hass,
-        LOGGER,
-        name="Beszel API",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=UPDATE_INTERVAL),
+        entry,
+        client,
+        snapshot_store=Store(hass, STORAGE_VERSION, _snapshot_key(entry)),
+        metrics=metrics,
     )
+    # Stats run on their own, slower schedule so liveness is never held up by them
+    stats_coordinator = BeszelStatsCoordinator(hass, entry, client, coordinator, metrics=metrics)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as e:
-        LOGGER.error(f"Failed to initialize coordinator: {e}")
-        raise
+    # Warm start: create entities from the last snapshot and refresh in the background
+    warm = await coordinator.async_load_snapshot()
+    if not warm:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+            # Only the systems list may hold up setup; if the stats fail their
+            # entities are created by discovery once a later refresh succeeds
+            await stats_coordinator.async_refresh()
+        except Exception as e:
+            LOGGER.error(f"Failed to initialize coordinator: {e}")
+            raise
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    if coordinator.push:
+        entry.async_create_background_task(
+            hass, coordinator.async_listen_realtime(), "beszel_api realtime"
+        )
+
     try:
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     except Exception as e:
         LOGGER.error(f"Failed to setup platforms: {e}")
         raise
+
+    if warm:
+        entry.async_create_background_task(
+            hass, _async_refresh_all(coordinator, stats_coordinator), "beszel_api first refresh"
+        )
+
+    if entry.options.get(CONF_BACKFILL, False):
+        if "recorder" in hass.config.components:
+            backfill = BeszelBackfill(
+                hass, coordinator, Store(hass, STORAGE_VERSION, _backfill_key(entry))
+            )
+            entry.async_on_unload(
+                async_track_time_interval(
+                    hass, backfill.async_run, timedelta(seconds=BACKFILL_INTERVAL)
+                )
+            )
+            entry.async_create_background_task(hass, backfill.async_run(), "beszel_api backfill")
+        else:
+            LOGGER.warning("Stats backfill needs the recorder integration, which is not loaded")
     return True
 
+async def _async_refresh_all(coordinator, stats_coordinator):
+    # Stats are fetched for the systems the first refresh found
+    await coordinator.async_refresh()
+    await stats_coordinator.async_refresh()
+
+async def async_reload_entry(hass, entry):
+    """Reload the entry so changed options take effect."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass, entry):
+    """Delete the stored auth token, snapshot and backfill progress together with the entry."""
+    await Store(hass, STORAGE_VERSION, _auth_key(entry)).async_remove()
+    await Store(hass, STORAGE_VERSION, _snapshot_key(entry)).async_remove()
+    await Store(hass, STORAGE_VERSION, _backfill_key(entry)).async_remove()
+
 async def async_unload_entry(hass, entry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
+
+async def async_remove_config_entry_device(hass, entry, device_entry):
+    """Allow removing the device of a system that no longer exists on the hub."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    systems = coordinator.data.get("systems", {}) if coordinator.data else {}
+    # The hub device (identified by the entry id) carries the coordinator sensors
+    return not any(
+        domain == DOMAIN and (system_id in systems or system_id == entry.entry_id)
+        for domain, system_id in device_entry.identifiers
+    )
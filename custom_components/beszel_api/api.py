@@ -1,50 +1,856 @@
+import asyncio
+import base64
+import codecs
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import aiohttp
 from pocketbase import PocketBase
 import logging
 
+from .const import DEFAULT_REQUEST_TIMEOUT, DEFAULT_STATS_TYPE
+
 LOGGER = logging.getLogger(__name__)
 
+# Page size used for batched stats queries
+STATS_PAGE_SIZE = 500
+# Only look at stats records created within this window (seconds) when batching
+STATS_WINDOW = 600
+# Per-system stats queries look back at most this far (seconds)
+STATS_FALLBACK_WINDOW = 24 * 3600
+# The realtime stream is considered dead after this many seconds without data.
+# PocketBase closes idle realtime clients after five minutes.
+REALTIME_READ_TIMEOUT = 330
+# Refresh the auth token once less than half its lifetime remains, but no
+# earlier than this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 24 * 3600
+# A container_stats record holds one {n, c, m, ns, nr} entry per container
+CONTAINER_STATS_FIELDS = ("id", "system", "created", "stats")
+# container_stats are only looked for within this many periods of the record
+# type: hosts without Docker never write one, so the batched query cannot stop
+# early and reads its whole window
+CONTAINER_STATS_PERIODS = 2
+# Bytes read from a list response at a time while decoding its items
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Brotli is only asked for when one of these packages can decode it
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+_ITEMS_START = re.compile(r'"items"\s*:\s*\[')
+_JSON = json.JSONDecoder()
+
+
+def _format_pb_datetime(dt):
+    """Format a datetime the way PocketBase stores it (``2024-01-01 10:00:00.000Z``)."""
+    return dt.strftime("%Y-%m-%d %H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+def pb_timestamp(value):
+    """Return a record timestamp as a PocketBase datetime string.
+
+    The SDK parses ``created``/``updated`` into datetimes while the native
+    client keeps the raw strings; both compare correctly once formatted.
+    """
+    if isinstance(value, datetime):
+        return _format_pb_datetime(value.astimezone(timezone.utc))
+    return value or None
+
+
+def _stats_since(record_type, window=STATS_WINDOW, periods=3):
+    """Lower bound of a stats query window in PocketBase format.
+
+    The window spans at least ``periods`` periods of ``record_type`` so coarse
+    series always have a record in it.
+    """
+    window = max(window, periods * 60 * int(record_type.rstrip("m")))
+    return _format_pb_datetime(datetime.now(timezone.utc) - timedelta(seconds=window))
+
+
+def _latest_filter(record_type, since, system_id=None):
+    """Filter for stats of one record type created since ``since``, optionally of one system."""
+    query = f"type = '{record_type}' && created >= '{since}'"
+    return f"system = '{system_id}' && {query}" if system_id else query
+
+
+def _history_filter(record_type, since, until, after):
+    """Filter for stats created in ``[since, until)`` after the ``(created, id)`` cursor ``after``."""
+    query = f"type = '{record_type}' && created >= '{since}' && created < '{until}'"
+    if after:
+        created, record_id = after
+        query += f" && (created > '{created}' || (created = '{created}' && id > '{record_id}'))"
+    return query
+
+
+def _fields_param(fields):
+    """Build the PocketBase ``fields`` query parameter, or None to return all fields."""
+    return ",".join(sorted(fields)) if fields else None
+
+
+def _with_fields(params, fields):
+    if fields:
+        params["fields"] = fields
+    return params
+
+
+def _token_claim(token, claim):
+    """Return a numeric claim of a PocketBase JWT, or None if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))[claim])
+    except Exception:
+        return None
+
+
+def _token_expiry(token):
+    """Return the ``exp`` claim of a PocketBase JWT, or 0 if it cannot be read."""
+    return _token_claim(token, "exp") or 0
+
+
+def _refresh_margin(token, issued):
+    """Seconds before expiry at which ``token`` is refreshed.
+
+    Half the token lifetime, from its ``iat`` claim or, as PocketBase tokens
+    usually lack one, from when it was received (``issued``), capped at
+    ``TOKEN_REFRESH_MARGIN``. Short-lived tokens are thus not refreshed on
+    every request.
+    """
+    issued_at = _token_claim(token, "iat") or issued
+    if issued_at is None:
+        return TOKEN_REFRESH_MARGIN
+    return min(TOKEN_REFRESH_MARGIN, max(0, _token_expiry(token) - issued_at) / 2)
+
+
+def _is_unauthorized(err):
+    return getattr(err, "status", None) == 401
+
+
+def _to_record(item):
+    """Wrap a raw JSON record so it is accessed like an SDK ``Record`` (``record.id``, ``record.info``)."""
+    return SimpleNamespace(**item)
+
+class _BodyDecoder:
+    """Incrementally decompresses a body sent with ``Content-Encoding``.
+
+    Responses are read with aiohttp's own decompression switched off, so the
+    bytes recorded in the metrics are the ones that crossed the wire.
+    """
+
+    def __init__(self, encoding):
+        encoding = (encoding or "identity").strip().lower()
+        # Some servers send deflate without the zlib wrapper; told apart by the first byte
+        self._check_raw_deflate = encoding == "deflate"
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            # 32 + MAX_WBITS accepts both gzip and zlib headers
+            self._set_zlib(32 + zlib.MAX_WBITS)
+        elif encoding == "br" and brotli is not None:
+            self._obj = brotli.Decompressor()
+            # brotli names it process, brotlicffi decompress
+            self._decompress = getattr(self._obj, "process", None) or self._obj.decompress
+        elif encoding == "identity":
+            self._obj = None
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+    def _set_zlib(self, wbits):
+        self._obj = zlib.decompressobj(wbits)
+        self._decompress = self._obj.decompress
+
+    def feed(self, chunk):
+        if self._check_raw_deflate and chunk:
+            self._check_raw_deflate = False
+            # A zlib header starts with compression method 8 in its low bits
+            if chunk[0] & 0x0F != 8:
+                self._set_zlib(-zlib.MAX_WBITS)
+        return self._decompress(chunk) if self._obj is not None else chunk
+
+    def close(self):
+        flush = getattr(self._obj, "flush", None)
+        return flush() if flush is not None else b""
+
+
+class _ItemsDecoder:
+    """Incrementally decodes the ``items`` array of a PocketBase list response.
+
+    ``feed`` takes the next chunk of the body and returns the items it
+    completed, so only the unparsed tail of the body is held in memory instead
+    of the whole response. ``close`` returns whatever is left; a body without
+    an ``items`` array is decoded in one go as a fallback.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_items = False
+        self._done = False
+
+    def feed(self, chunk, final=False):
+        self._buffer += self._text.decode(chunk, final)
+        if self._done:
+            return []
+        if not self._in_items:
+            match = _ITEMS_START.search(self._buffer)
+            if match is None:
+                return []
+            self._in_items = True
+            self._buffer = self._buffer[match.end():]
+
+        items = []
+        pos = 0
+        buffer = self._buffer
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == "]":
+                # The rest is page metadata, which is not needed
+                self._done = True
+                pos = len(buffer)
+                break
+            try:
+                item, pos = _JSON.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # The item continues in the next chunk
+                break
+            items.append(item)
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self):
+        items = self.feed(b"", final=True)
+        if not self._in_items:
+            return json.loads(self._buffer or "{}").get("items", [])
+        if not self._done:
+            raise ValueError("Truncated PocketBase list response")
+        return items
+
+
 class BeszelApiClient:
-    def __init__(self, url, username: str | None = None, password: str | None = None):
+    def __init__(
+        self,
+        url,
+        username: str | None = None,
+        password: str | None = None,
+        stats_type: str = DEFAULT_STATS_TYPE,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ):
         self._url = url.rstrip("/")
+        # Stats queries only read records of this type (``1m``, ``10m``, ...)
+        self._stats_type = stats_type
+        self._request_timeout = request_timeout
         self._username = username
         self._password = password
         self._client = None
+        # Calls may run concurrently on several executor threads
+        self._lock = threading.Lock()
+        self._system_fields = None
+        self._stats_fields = None
+
+    def set_fields(self, system_fields, stats_fields):
+        """Restrict systems and stats queries to the given (dotted) fields, None for all."""
+        self._system_fields = _fields_param(system_fields)
+        self._stats_fields = _fields_param(stats_fields)
+
+    def _reset_client(self, rejected):
+        """Drop the ``rejected`` client so the next call authenticates again.
+
+        A client another call already replaced is left alone, so concurrent
+        calls rejected together authenticate only once.
+        """
+        with self._lock:
+            if self._client is rejected:
+                self._client = None
 
     def _ensure_client(self):
-        """Initialize the PocketBase client if not already done"""
-        if self._client is None:
-            try:
-                self._client = PocketBase(self._url)
-                if self._username and self._password:
-                    self._client.collection("users").auth_with_password(
-                        self._username,
-                        self._password,
-                    )
-            except Exception as e:
-                LOGGER.error(f"Failed to initialize PocketBase client: {e}")
+        """Initialize the PocketBase client if not already done, and return it."""
+        with self._lock:
+            if self._client is None:
+                try:
+                    client = PocketBase(self._url, timeout=self._request_timeout)
+                    if self._username and self._password:
+                        client.collection("users").auth_with_password(
+                            self._username,
+                            self._password,
+                        )
+                    self._client = client
+                except Exception as e:
+                    LOGGER.error(f"Failed to initialize PocketBase client: {e}")
+                    raise
+            return self._client
+
+    def _call(self, fn):
+        """Run ``fn(client)``, authenticating again and retrying once on a 401."""
+        client = self._ensure_client()
+        try:
+            return fn(client)
+        except Exception as e:
+            if not _is_unauthorized(e):
                 raise
+            LOGGER.debug("PocketBase rejected the token, authenticating again")
+            self._reset_client(client)
+            return fn(self._ensure_client())
 
-    def get_systems(self):
+    def get_systems(self, updated_after: str | None = None):
+        """Get all systems, or only those updated at or after ``updated_after``."""
         try:
-            self._ensure_client()
-            records = self._client.collection("systems").get_full_list()
+            query = {"filter": f"updated >= '{updated_after}'"} if updated_after else {}
+            records = self._call(
+                lambda client: client.collection("systems").get_full_list(
+                    query_params=_with_fields(query, self._system_fields)
+                )
+            )
             return records
         except Exception as e:
             LOGGER.error(f"Failed to fetch systems: {e}")
             raise
 
+    def get_system_ids(self):
+        """Get the ids of all systems, used to detect deletions cheaply."""
+        try:
+            records = self._call(
+                lambda client: client.collection("systems").get_full_list(
+                    query_params={"fields": "id"}
+                )
+            )
+            return {record.id for record in records}
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch system ids: {e}")
+            raise
+
     def get_system_stats(self, system_id):
         """Get the latest system stats for a specific system"""
         try:
-            self._ensure_client()
             # Get the latest record for the specific system
-            records = self._client.collection("system_stats").get_list(
-                1, 1, {"filter": f"system = '{system_id}'", "sort": "-created"}
+            records = self._call(
+                lambda client: client.collection("system_stats").get_list(
+                    1,
+                    1,
+                    _with_fields(
+                        {
+                            "filter": _latest_filter(
+                                self._stats_type,
+                                _stats_since(self._stats_type, STATS_FALLBACK_WINDOW),
+                                system_id,
+                            ),
+                            "sort": "-created",
+                        },
+                        self._stats_fields,
+                    ),
+                )
             )
             if records.items:
                 return records.items[0]
+            # No stats found
             return None
         except Exception as e:
             LOGGER.error(f"Failed to fetch stats for system {system_id}: {e}")
-            # Return None if no stats found or error occurs
+            raise
+
+    def _latest_per_system(self, collection, system_ids, fields, since=None):
+        """Newest record of ``collection`` per system in ``system_ids``, in as few queries as possible.
+
+        Pages through the recent window (from ``since``, ``STATS_WINDOW`` by
+        default) of the configured record type newest first and keeps the
+        first record seen per system. Systems without a record in the window
+        are simply missing from the returned dict.
+        """
+        wanted = set(system_ids)
+        latest = {}
+        if not wanted:
+            return latest
+        since = since or _stats_since(self._stats_type)
+        page = 1
+        while True:
+            records = self._call(
+                lambda client: client.collection(collection).get_list(
+                    page,
+                    STATS_PAGE_SIZE,
+                    _with_fields(
+                        {
+                            "filter": _latest_filter(self._stats_type, since),
+                            "sort": "-created",
+                            "skipTotal": True,
+                        },
+                        fields,
+                    ),
+                )
+            )
+            for record in records.items:
+                sid = getattr(record, "system", None)
+                if sid in wanted and sid not in latest:
+                    latest[sid] = record
+            # Stop as soon as every system has its newest record or the window is exhausted
+            if len(latest) == len(wanted) or len(records.items) < STATS_PAGE_SIZE:
+                break
+            page += 1
+        return latest
+
+    def get_latest_stats(self, system_ids):
+        """Get the latest stats record for every system in as few queries as possible."""
+        try:
+            return self._latest_per_system("system_stats", system_ids, self._stats_fields)
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch batched stats: {e}")
+            raise
+
+    def get_latest_container_stats(self, system_ids):
+        """Get the latest ``container_stats`` record of every system in one paged query."""
+        try:
+            return self._latest_per_system(
+                "container_stats",
+                system_ids,
+                _fields_param(CONTAINER_STATS_FIELDS),
+                _stats_since(self._stats_type, 0, CONTAINER_STATS_PERIODS),
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch container stats: {e}")
+            raise
+
+    def get_stats_history(self, since, until, after=None, fields=None):
+        """Get one page of stats created in ``[since, until)``, oldest first.
+
+        Pages are walked with a keyset cursor: pass the ``(created, id)`` of
+        the last record of the previous page as ``after``. A page shorter than
+        ``STATS_PAGE_SIZE`` is the last one.
+        """
+        try:
+            records = self._call(
+                lambda client: client.collection("system_stats").get_list(
+                    1,
+                    STATS_PAGE_SIZE,
+                    _with_fields(
+                        {
+                            "filter": _history_filter(self._stats_type, since, until, after),
+                            "sort": "created,id",
+                            "skipTotal": True,
+                        },
+                        _fields_param(fields),
+                    ),
+                )
+            )
+            return records.items
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch stats history: {e}")
+            raise
+
+
+class BeszelSdkAsyncClient:
+    """Async facade over the synchronous SDK client.
+
+    Every call is run on the Home Assistant executor. Used as a fallback when
+    the native client cannot be used against a hub.
+    """
+
+    def __init__(self, client, async_add_executor_job):
+        self._client = client
+        self._run = async_add_executor_job
+
+    def set_fields(self, system_fields, stats_fields):
+        self._client.set_fields(system_fields, stats_fields)
+
+    async def get_systems(self, updated_after=None):
+        return await self._run(self._client.get_systems, updated_after)
+
+    async def get_system_ids(self):
+        return await self._run(self._client.get_system_ids)
+
+    async def get_system_stats(self, system_id):
+        return await self._run(self._client.get_system_stats, system_id)
+
+    async def get_latest_stats(self, system_ids):
+        return await self._run(self._client.get_latest_stats, system_ids)
+
+    async def get_latest_container_stats(self, system_ids):
+        return await self._run(self._client.get_latest_container_stats, system_ids)
+
+    async def get_stats_history(self, since, until, after=None, fields=None):
+        return await self._run(self._client.get_stats_history, since, until, after, fields)
+
+
+class BeszelAsyncApiClient:
+    """PocketBase REST client running natively on asyncio.
+
+    Requests go through the given aiohttp session, so connections are pooled
+    and kept alive between polls. Records are returned with the same attribute
+    access as the SDK (``record.id``, ``record.info``, ``record.stats``).
+
+    The auth token is kept in ``token_store`` (anything with ``async_load`` and
+    ``async_save``, e.g. a Home Assistant ``Store``) so restarts skip the slow
+    password auth. It is refreshed before it expires, and a request rejected
+    with 401 authenticates again and is retried once.
+
+    If ``metrics`` (a ``BeszelMetrics``) is given, every request and the
+    bytes received are recorded in it, counted as sent (compressed).
+
+    Responses are requested gzip (or brotli, when available) compressed, and
+    list pages are decoded item by item while the body streams in, so large
+    pages are never buffered whole.
+
+    Every request is abandoned after ``request_timeout`` seconds, so a hanging
+    hub or agent cannot stall a refresh.
+
+    Stats queries only read records of ``stats_type`` within a bounded
+    ``created`` window, like the SDK client.
+    """
+
+    def __init__(
+        self,
+        session,
+        url,
+        username: str | None = None,
+        password: str | None = None,
+        token_store=None,
+        metrics=None,
+        stats_type: str = DEFAULT_STATS_TYPE,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ):
+        self._session = session
+        self._stats_type = stats_type
+        self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self._url = url.rstrip("/")
+        self._username = username
+        self._password = password
+        self._token = None
+        # When the current token was received, for its refresh margin
+        self._token_issued = None
+        self._token_store = token_store
+        self._store_loaded = token_store is None
+        self._auth_lock = asyncio.Lock()
+        self._metrics = metrics
+        self._system_fields = None
+        self._stats_fields = None
+
+    def set_fields(self, system_fields, stats_fields):
+        """Restrict systems and stats queries to the given (dotted) fields, None for all."""
+        self._system_fields = _fields_param(system_fields)
+        self._stats_fields = _fields_param(stats_fields)
+
+    def _request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self._timeout)
+        # Bodies are decompressed by _BodyDecoder, after their wire size is counted
+        kwargs["auto_decompress"] = False
+        kwargs["headers"] = {"Accept-Encoding": ACCEPT_ENCODING, **(kwargs.get("headers") or {})}
+        return self._session.request(method, f"{self._url}{path}", **kwargs)
+
+    async def _request_json(self, method, path, **kwargs):
+        """Send one request and decode its JSON body, recording it in the metrics."""
+        try:
+            async with self._request(method, path, **kwargs) as resp:
+                resp.raise_for_status()
+                raw = await resp.read()
+                body = _BodyDecoder(resp.headers.get("Content-Encoding"))
+                body = body.feed(raw) + body.close()
+        except Exception:
+            if self._metrics is not None:
+                self._metrics.record_request_error()
+            raise
+        if self._metrics is not None:
+            self._metrics.record_request(len(raw))
+        return json.loads(body)
+
+    async def _load_token(self):
+        """Pick up the token persisted by a previous run, if it belongs to this user."""
+        self._store_loaded = True
+        try:
+            stored = await self._token_store.async_load()
+        except Exception as e:
+            LOGGER.warning(f"Failed to load stored PocketBase token: {e}")
+            return
+        if (
+            stored
+            and stored.get("username") == self._username
+            and _token_expiry(stored.get("token", "")) > time.time()
+        ):
+            self._token = stored["token"]
+            # Stores written before the issue time was kept count from now
+            self._token_issued = stored.get("issued", time.time())
+
+    async def _save_token(self):
+        if self._token_store is None:
+            return
+        try:
+            await self._token_store.async_save(
+                {"username": self._username, "token": self._token, "issued": self._token_issued}
+            )
+        except Exception as e:
+            LOGGER.warning(f"Failed to store PocketBase token: {e}")
+
+    async def _auth_request(self, path, **kwargs):
+        data = await self._request_json("POST", path, **kwargs)
+        self._token = data["token"]
+        self._token_issued = time.time()
+        await self._save_token()
+
+    async def _authenticate(self, rejected=None):
+        """Make sure a valid token is available if credentials are set.
+
+        ``rejected`` is a token the hub turned down: it is discarded and the
+        password used again, unless a concurrent request already replaced it,
+        so requests rejected together authenticate only once.
+        """
+        if not (self._username and self._password):
+            return
+        async with self._auth_lock:
+            if rejected is not None and self._token == rejected:
+                self._token = None
+            elif not self._store_loaded:
+                await self._load_token()
+
+            if self._token is not None:
+                remaining = _token_expiry(self._token) - time.time()
+                if remaining > _refresh_margin(self._token, self._token_issued):
+                    return
+
+            if self._token is not None and _token_expiry(self._token) > time.time():
+                # Still valid but close to expiry: a refresh skips password hashing on the hub
+                try:
+                    await self._auth_request(
+                        "/api/collections/users/auth-refresh", headers=self._headers()
+                    )
+                    return
+                except Exception as e:
+                    LOGGER.debug(f"PocketBase token refresh failed, authenticating again: {e}")
+
+            try:
+                await self._auth_request(
+                    "/api/collections/users/auth-with-password",
+                    json={"identity": self._username, "password": self._password},
+                )
+            except Exception as e:
+                self._token = None
+                LOGGER.error(f"Failed to authenticate against PocketBase: {e}")
+                raise
+
+    def _headers(self):
+        return {"Authorization": self._token} if self._token else {}
+
+    async def _stream_items(self, path, params):
+        """Yield the raw items of one list response as they are decoded from the body."""
+        decoder = _ItemsDecoder()
+        received = 0
+        try:
+            async with self._request("GET", path, params=params, headers=self._headers()) as resp:
+                resp.raise_for_status()
+                body = _BodyDecoder(resp.headers.get("Content-Encoding"))
+                async for chunk in resp.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    received += len(chunk)
+                    for item in decoder.feed(body.feed(chunk)):
+                        yield item
+                rest = decoder.feed(body.close())
+            rest += decoder.close()
+        except Exception:
+            if self._metrics is not None:
+                self._metrics.record_request_error()
+            raise
+        if self._metrics is not None:
+            self._metrics.record_request(received)
+        for item in rest:
+            yield item
+
+    async def _iter_list(self, collection, page, per_page, **params):
+        """Yield the raw items of one page of a collection as they arrive."""
+        query = {"page": str(page), "perPage": str(per_page), "skipTotal": "1"}
+        query.update({k: str(v) for k, v in params.items()})
+        path = f"/api/collections/{collection}/records"
+        await self._authenticate()
+        retry = bool(self._token)
+        while True:
+            # The token this attempt is sent with
+            token = self._token
+            try:
+                async for item in self._stream_items(path, query):
+                    # Items already handed out cannot be taken back
+                    retry = False
+                    yield item
+                return
+            except aiohttp.ClientResponseError as e:
+                if not retry or not _is_unauthorized(e):
+                    raise
+                retry = False
+                LOGGER.debug("PocketBase rejected the token, authenticating again")
+                await self._authenticate(rejected=token)
+
+    async def _get_list(self, collection, page, per_page, **params):
+        """Fetch one page of a collection and return its raw items."""
+        return [item async for item in self._iter_list(collection, page, per_page, **params)]
+
+    async def _get_full_list(self, collection, **params):
+        items = []
+        page = 1
+        while True:
+            batch = await self._get_list(collection, page, STATS_PAGE_SIZE, **params)
+            items.extend(batch)
+            if len(batch) < STATS_PAGE_SIZE:
+                return items
+            page += 1
+
+    async def get_systems(self, updated_after: str | None = None):
+        """Get all systems, or only those updated at or after ``updated_after``."""
+        try:
+            params = {"filter": f"updated >= '{updated_after}'"} if updated_after else {}
+            items = await self._get_full_list("systems", **_with_fields(params, self._system_fields))
+            return [_to_record(item) for item in items]
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch systems: {e}")
+            raise
+
+    async def get_system_ids(self):
+        """Get the ids of all systems, used to detect deletions cheaply."""
+        try:
+            items = await self._get_full_list("systems", fields="id")
+            return {item["id"] for item in items}
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch system ids: {e}")
+            raise
+
+    async def get_system_stats(self, system_id):
+        """Get the latest system stats for a specific system"""
+        try:
+            items = await self._get_list(
+                "system_stats",
+                1,
+                1,
+                **_with_fields(
+                    {
+                        "filter": _latest_filter(
+                            self._stats_type,
+                            _stats_since(self._stats_type, STATS_FALLBACK_WINDOW),
+                            system_id,
+                        ),
+                        "sort": "-created",
+                    },
+                    self._stats_fields,
+                ),
+            )
+            if items:
+                return _to_record(items[0])
             return None
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch stats for system {system_id}: {e}")
+            raise
+
+    async def _latest_per_system(self, collection, system_ids, fields, since=None):
+        """Newest record of ``collection`` per system, see ``BeszelApiClient._latest_per_system``."""
+        wanted = set(system_ids)
+        latest = {}
+        if not wanted:
+            return latest
+        since = since or _stats_since(self._stats_type)
+        page = 1
+        while True:
+            # Only the newest record of each system is kept, as soon as it is decoded
+            count = 0
+            async for item in self._iter_list(
+                collection,
+                page,
+                STATS_PAGE_SIZE,
+                **_with_fields(
+                    {"filter": _latest_filter(self._stats_type, since), "sort": "-created"},
+                    fields,
+                ),
+            ):
+                count += 1
+                sid = item.get("system")
+                if sid in wanted and sid not in latest:
+                    latest[sid] = _to_record(item)
+            if len(latest) == len(wanted) or count < STATS_PAGE_SIZE:
+                break
+            page += 1
+        return latest
+
+    async def get_latest_stats(self, system_ids):
+        """Get the latest stats record for every system, see ``BeszelApiClient.get_latest_stats``."""
+        try:
+            return await self._latest_per_system("system_stats", system_ids, self._stats_fields)
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch batched stats: {e}")
+            raise
+
+    async def get_latest_container_stats(self, system_ids):
+        """Get the latest ``container_stats`` record of every system in one paged query."""
+        try:
+            return await self._latest_per_system(
+                "container_stats",
+                system_ids,
+                _fields_param(CONTAINER_STATS_FIELDS),
+                _stats_since(self._stats_type, 0, CONTAINER_STATS_PERIODS),
+            )
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch container stats: {e}")
+            raise
+
+    async def get_stats_history(self, since, until, after=None, fields=None):
+        """Get one page of stats created in ``[since, until)``, see ``BeszelApiClient.get_stats_history``."""
+        try:
+            items = await self._get_list(
+                "system_stats",
+                1,
+                STATS_PAGE_SIZE,
+                **_with_fields(
+                    {
+                        "filter": _history_filter(self._stats_type, since, until, after),
+                        "sort": "created,id",
+                    },
+                    _fields_param(fields),
+                ),
+            )
+            return [_to_record(item) for item in items]
+        except Exception as e:
+            LOGGER.error(f"Failed to fetch stats history: {e}")
+            raise
+
+    async def subscribe(self, collections, on_connect=None):
+        """Yield ``(collection, action, record)`` for realtime changes on the given collections.
+
+        Opens the PocketBase SSE stream, subscribes once the hub hands out a
+        client id and returns when the hub closes the stream. ``on_connect`` is
+        called once the subscription is in place.
+        """
+        await self._authenticate()
+        async with self._session.get(
+            f"{self._url}/api/realtime",
+            headers={"Accept": "text/event-stream"},
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=REALTIME_READ_TIMEOUT),
+        ) as resp:
+            resp.raise_for_status()
+            event = None
+            data = []
+            async for raw in resp.content:
+                line = raw.decode("utf-8").rstrip("\r\n")
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].lstrip())
+                elif not line and event:
+                    payload = json.loads("\n".join(data)) if data else {}
+                    if event == "PB_CONNECT":
+                        async with self._session.post(
+                            f"{self._url}/api/realtime",
+                            json={
+                                "clientId": payload["clientId"],
+                                "subscriptions": [f"{c}/*" for c in collections],
+                            },
+                            headers=self._headers(),
+                        ) as sub:
+                            sub.raise_for_status()
+                        if on_connect is not None:
+                            on_connect()
+                    elif isinstance(payload.get("record"), dict):
+                        # Topics look like "systems/*"
+                        yield event.split("/", 1)[0], payload.get("action"), _to_record(payload["record"])
+                    event = None
+                    data = []
@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant before 2025.4 only knows has_mean
+    StatisticMeanType = None
+
+from .api import STATS_PAGE_SIZE, pb_timestamp
+from .const import (
+    DOMAIN, BACKFILL_MAX_AGE, BACKFILL_CHUNK, BACKFILL_METRICS, LOGGER,
+)
+
+BACKFILL_FIELDS = ("id", "system", "created") + tuple(f"stats.{metric}" for metric in BACKFILL_METRICS)
+
+
+def _hour_start(hour):
+    """Datetime of an ``YYYY-MM-DD HH`` hour key (the prefix of a PocketBase timestamp)."""
+    return datetime.strptime(hour, "%Y-%m-%d %H").replace(tzinfo=timezone.utc)
+
+
+class _HourlyAggregator:
+    """Streaming hourly mean/min/max per system and metric.
+
+    Records must arrive ordered by ``created``; each system and metric then
+    has a single open hour, closed as soon as a record of a later hour shows
+    up, so raw records are never kept, only one row per completed hour.
+    """
+
+    def __init__(self):
+        # (system id, metric) -> [hour, count, total, min, max]
+        self._open = {}
+        # (system id, metric) -> completed statistic rows
+        self._done = {}
+
+    def add(self, system_id, created, stats):
+        hour = created[:13]
+        for metric in BACKFILL_METRICS:
+            value = stats.get(metric)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            key = (system_id, metric)
+            bucket = self._open.get(key)
+            if bucket is not None and bucket[0] == hour:
+                bucket[1] += 1
+                bucket[2] += value
+                bucket[3] = min(bucket[3], value)
+                bucket[4] = max(bucket[4], value)
+                continue
+            if bucket is not None:
+                self._finish(key, bucket)
+            self._open[key] = [hour, 1, value, value, value]
+
+    def _finish(self, key, bucket):
+        hour, count, total, low, high = bucket
+        self._done.setdefault(key, []).append(
+            {"start": _hour_start(hour), "mean": total / count, "min": low, "max": high}
+        )
+
+    def close(self):
+        """Complete all open hours; only valid once the window end is reached."""
+        for key, bucket in self._open.items():
+            self._finish(key, bucket)
+        self._open = {}
+
+    def completed(self):
+        return self._done
+
+
+class BeszelBackfill:
+    """Imports the hub's ``system_stats`` history into long-term statistics.
+
+    Only whole hours before the current one are imported, as external
+    statistics ``beszel_api:<system id>_<metric>`` with hourly mean, min and
+    max. Records are streamed page by page with a keyset cursor and folded
+    into ``_HourlyAggregator``; nothing is written as entity state. The rows
+    of a ``BACKFILL_CHUNK`` window are imported once the window is complete,
+    with one recorder import per statistic, not one per page. The end of
+    the last imported window is kept in ``store`` so each run continues where
+    the previous one stopped, or starts ``BACKFILL_MAX_AGE`` days back.
+    """
+
+    def __init__(self, hass, coordinator, store):
+        self.hass = hass
+        self.coordinator = coordinator
+        self._store = store
+        self._lock = asyncio.Lock()
+        self._imported_until = None
+
+    async def async_run(self, now=None):
+        """Import all hours completed since the last run; a run in progress is not doubled."""
+        if self._lock.locked():
+            return
+        async with self._lock:
+            try:
+                await self._async_run()
+            except Exception as e:
+                LOGGER.warning(f"Stats backfill stopped, continuing on the next run: {e}")
+
+    async def _async_run(self):
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        if self._imported_until is None:
+            stored = await self._store.async_load() or {}
+            if stored.get("imported_until"):
+                self._imported_until = datetime.fromisoformat(stored["imported_until"])
+        start = end - timedelta(days=BACKFILL_MAX_AGE)
+        if self._imported_until is not None:
+            start = max(start, self._imported_until)
+
+        while start < end:
+            until = min(start + timedelta(seconds=BACKFILL_CHUNK), end)
+            rows = await self._async_import_window(start, until)
+            LOGGER.debug(f"Backfilled {rows} hourly statistics from {start} to {until}")
+            self._imported_until = start = until
+            await self._store.async_save({"imported_until": until.isoformat()})
+
+    async def _async_import_window(self, since, until):
+        aggregator = _HourlyAggregator()
+        since, until = pb_timestamp(since), pb_timestamp(until)
+        after = None
+        while True:
+            records = await self.coordinator.client.get_stats_history(
+                since, until, after, BACKFILL_FIELDS
+            )
+            for record in records:
+                stats = getattr(record, "stats", None)
+                aggregator.add(
+                    record.system, pb_timestamp(record.created), stats if isinstance(stats, dict) else {}
+                )
+            if len(records) < STATS_PAGE_SIZE:
+                break
+            last = records[-1]
+            after = (pb_timestamp(last.created), last.id)
+        aggregator.close()
+        return self._import(aggregator.completed())
+
+    def _import(self, completed):
+        systems = self.coordinator.data["systems"] if self.coordinator.data else {}
+        rows = 0
+        for (system_id, metric), statistics in completed.items():
+            label, unit = BACKFILL_METRICS[metric]
+            system = systems.get(system_id)
+            metadata = {
+                "source": DOMAIN,
+                "statistic_id": f"{DOMAIN}:{system_id.lower()}_{metric}",
+                "name": f"{system.name if system else system_id} {label}",
+                "unit_of_measurement": unit,
+                "has_mean": True,
+                "has_sum": False,
+            }
+            if StatisticMeanType is not None:
+                metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+            async_add_external_statistics(self.hass, metadata, statistics)
+            rows += len(statistics)
+        return rows
@@ -1,30 +1,31 @@
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.core import callback
 from .const import DOMAIN
+from .entity import BeszelEntity
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = []
-
-    # Get systems from coordinator data
-    systems = coordinator.data['systems']
-
-    for system in systems:
-        entities.append(BeszelStatusBinarySensor(coordinator, system))
-    async_add_entities(entities)
-
-class BeszelStatusBinarySensor(CoordinatorEntity, BinarySensorEntity):
-    def __init__(self, coordinator, system):
-        super().__init__(coordinator)
-        self._system_id = system.id
-
-    @property
-    def system(self):
-        systems = self.coordinator.data['systems']
-        for s in systems:
-            if s.id == self._system_id:
-                return s
-        return None
+    known = set()
+
+    @callback
+    def _async_add_new_systems():
+        """Add status sensors for systems not seen before."""
+        if not coordinator.data:
+            return
+        entities = []
+        for system in coordinator.data['systems'].values():
+            if system.id not in known:
+                known.add(system.id)
+                entities.append(BeszelStatusBinarySensor(coordinator, system))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_systems()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_systems))
+
+class BeszelStatusBinarySensor(BeszelEntity, BinarySensorEntity):
+    def _state_value(self):
+        return self.is_on
 
     @property
     def unique_id(self):
@@ -41,18 +42,3 @@ class BeszelStatusBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def device_class(self):
         return "connectivity"
-
-    @property
-    def device_info(self):
-        sys = self.system
-        if sys is None:
-            return None
-        info = getattr(sys, "info", {})
-        return {
-            "identifiers": {(DOMAIN, sys.id)},
-            "name": sys.name,
-            "manufacturer": "Beszel",
-            "model": info.get("m"),
-            "sw_version": info.get("v"),
-            "hw_version": info.get("k"),
-        }
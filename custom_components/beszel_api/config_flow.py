@@ -1,6 +1,14 @@
 import voluptuous as vol
 from homeassistant import config_entries
-from .const import DOMAIN, CONF_URL, CONF_USERNAME, CONF_PASSWORD
+from homeassistant.core import callback
+from .const import (
+    DOMAIN, CONF_URL, CONF_USERNAME, CONF_PASSWORD, CONF_USE_SDK, CONF_PUSH, CONF_BACKFILL,
+    CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY,
+    CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL, CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL,
+    SENSOR_FAMILIES, CONF_FLEET_GROUPS, CONF_STATS_TYPE, DEFAULT_STATS_TYPE, STATS_TYPES,
+    CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT, CONF_CONTAINER_INCLUDE,
+)
+from .fleet import parse_groups
 
 class BeszelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -21,3 +29,57 @@ class BeszelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }),
             errors=errors,
         )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return BeszelOptionsFlow()
+
+
+class BeszelOptionsFlow(config_entries.OptionsFlow):
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_groups(user_input.get(CONF_FLEET_GROUPS, ""))
+            except ValueError:
+                errors[CONF_FLEET_GROUPS] = "invalid_groups"
+            if user_input[CONF_MAX_INTERVAL] < user_input[CONF_MIN_INTERVAL]:
+                errors["base"] = "max_below_min"
+            elif not errors:
+                return self.async_create_entry(title="", data={**self.config_entry.options, **user_input})
+
+        options = self.config_entry.options
+        schema = {
+            vol.Required(
+                CONF_SCAN_INTERVAL, default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+            ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Required(
+                CONF_MIN_INTERVAL, default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+            ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Required(
+                CONF_MAX_INTERVAL, default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+            ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Required(
+                CONF_MAX_CONCURRENCY, default=options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+            vol.Required(
+                CONF_REQUEST_TIMEOUT, default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+            vol.Required(
+                CONF_STATS_TYPE, default=options.get(CONF_STATS_TYPE, DEFAULT_STATS_TYPE)
+            ): vol.In(STATS_TYPES),
+        }
+        for family in SENSOR_FAMILIES:
+            schema[vol.Required(family, default=options.get(family, True))] = bool
+        schema[vol.Optional(CONF_FLEET_GROUPS, default=options.get(CONF_FLEET_GROUPS, ""))] = str
+        schema[vol.Optional(CONF_CONTAINER_INCLUDE, default=options.get(CONF_CONTAINER_INCLUDE, ""))] = str
+        schema[vol.Required(CONF_PUSH, default=options.get(CONF_PUSH, False))] = bool
+        schema[vol.Required(CONF_BACKFILL, default=options.get(CONF_BACKFILL, False))] = bool
+        schema[vol.Required(CONF_USE_SDK, default=options.get(CONF_USE_SDK, False))] = bool
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(schema),
+            errors=errors,
+        )
@@ -4,5 +4,85 @@ DOMAIN = "beszel_api"
 CONF_URL = "url"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
+# Use the synchronous pocketbase SDK instead of the native aiohttp client
+CONF_USE_SDK = "use_sdk"
 UPDATE_INTERVAL = 120
-LOGGER = logging.getLogger(__package__)
\ No newline at end of file
+# Version of the files kept in .storage
+STORAGE_VERSION = 1
+# Seconds to wait before writing the warm-start snapshot after a refresh
+SNAPSHOT_SAVE_DELAY = 60
+# Seconds between refreshes of the systems list, i.e. of liveness. Stats run
+# on their own coordinator, ticking at the minimum stats interval.
+CONF_SCAN_INTERVAL = "scan_interval"
+DEFAULT_SCAN_INTERVAL = 60
+# Seconds between id-only queries that detect systems deleted on the hub
+SYSTEMS_ID_CHECK_INTERVAL = 600
+# Fields always requested once queries are projected to what entities read.
+# cpu/mp/dp of the stats feed the adaptive scheduler.
+BASE_SYSTEM_FIELDS = ("id", "name", "status", "updated", "info.m", "info.v", "info.k")
+BASE_STATS_FIELDS = ("id", "system", "created", "stats.cpu", "stats.mp", "stats.dp")
+# Maximum number of per-system stats requests in flight at once
+CONF_MAX_CONCURRENCY = "max_concurrency"
+DEFAULT_MAX_CONCURRENCY = 8
+# Seconds a single request to the hub may take before it is abandoned
+CONF_REQUEST_TIMEOUT = "request_timeout"
+DEFAULT_REQUEST_TIMEOUT = 10
+# Circuit breaker: a system whose own stats query failed this many times in a
+# row is not queried for stats for BREAKER_COOLDOWN seconds and its stats
+# entities are unavailable meanwhile; one failed probe after the cooldown
+# opens it again
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 600
+# Adaptive polling: per-system stats intervals (seconds) range between these,
+# in steps of the stats coordinator's tick, which is the minimum. Both
+# coordinators back off up to the maximum while the hub is unreachable.
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+DEFAULT_MIN_INTERVAL = UPDATE_INTERVAL
+DEFAULT_MAX_INTERVAL = 600
+# A system whose cpu, memory or disk percentage moved at least this many
+# points since its last stats is polled faster, otherwise slower
+VOLATILITY_THRESHOLD = 5
+# Sensor families that can be switched off in the options flow (all on by default)
+CONF_ENABLE_GPU_ENGINES = "enable_gpu_engines"
+CONF_ENABLE_GPU_POWER_SPLIT = "enable_gpu_power_split"
+CONF_ENABLE_EFS = "enable_efs"
+CONF_ENABLE_TEMPERATURE = "enable_temperature"
+CONF_ENABLE_FLEET = "enable_fleet"
+SENSOR_FAMILIES = (
+    CONF_ENABLE_GPU_ENGINES,
+    CONF_ENABLE_GPU_POWER_SPLIT,
+    CONF_ENABLE_EFS,
+    CONF_ENABLE_TEMPERATURE,
+    CONF_ENABLE_FLEET,
+)
+# Fleet aggregate groups besides the whole fleet: "name=glob, name=glob" on system names
+CONF_FLEET_GROUPS = "fleet_groups"
+# Containers that get sensors: comma-separated globs on container names. Empty
+# (the default) creates no container sensors and skips the container query.
+CONF_CONTAINER_INCLUDE = "container_include"
+# Push mode: subscribe to PocketBase realtime events instead of polling
+CONF_PUSH = "push"
+REALTIME_COLLECTIONS = ("systems", "system_stats")
+# Consistency poll interval (seconds) while push mode is active
+PUSH_CONSISTENCY_INTERVAL = 900
+# Seconds to coalesce realtime events before entities are updated
+REALTIME_DEBOUNCE = 1
+# Seconds to wait before reconnecting a dropped realtime stream
+REALTIME_RECONNECT_DELAY = 10
+# Backfill: import the hub's stats history as hourly long-term statistics
+CONF_BACKFILL = "backfill"
+# Days of history the first backfill reaches back
+BACKFILL_MAX_AGE = 7
+# Seconds between backfill runs; each imports the hours completed since the last
+BACKFILL_INTERVAL = 3600
+# History is imported in windows of this many seconds, saving progress after each
+BACKFILL_CHUNK = 86400
+# Stats fields imported by the backfill: field -> (name suffix, unit)
+BACKFILL_METRICS = {"cpu": ("CPU", "%"), "mp": ("RAM", "%"), "dp": ("Disk", "%")}
+# Stats record type read from the hub. Beszel writes a 1m series per system
+# (the finest resolution it keeps) plus downsampled 10m, 20m, 120m and 480m ones
+CONF_STATS_TYPE = "stats_type"
+DEFAULT_STATS_TYPE = "1m"
+STATS_TYPES = ("1m", "10m", "20m", "120m", "480m")
+LOGGER = logging.getLogger(__package__)
@@ -0,0 +1,637 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from .const import (
+    CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY, CONF_PUSH, PUSH_CONSISTENCY_INTERVAL,
+    REALTIME_COLLECTIONS, REALTIME_DEBOUNCE, REALTIME_RECONNECT_DELAY, SYSTEMS_ID_CHECK_INTERVAL,
+    BASE_SYSTEM_FIELDS, BASE_STATS_FIELDS, CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL,
+    CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL, VOLATILITY_THRESHOLD, CONF_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL, SNAPSHOT_SAVE_DELAY, CONF_FLEET_GROUPS, CONF_STATS_TYPE,
+    DEFAULT_STATS_TYPE, BREAKER_THRESHOLD, BREAKER_COOLDOWN, CONF_CONTAINER_INCLUDE, LOGGER,
+)
+from .api import pb_timestamp
+from .fleet import compile_globs, compute_fleet, parse_groups
+from .metrics import BeszelMetrics
+from .models import BeszelStats, BeszelSystem, EMPTY_STATS, containers_from_raw, snapshot
+
+
+def _is_volatile(old, new):
+    """Whether cpu, memory or disk usage moved noticeably between two stats."""
+    for a, b in ((old.cpu, new.cpu), (old.mp, new.mp), (old.dp, new.dp)):
+        if a is not None and b is not None and abs(a - b) >= VOLATILITY_THRESHOLD:
+            return True
+    return False
+
+
+def _system_from_record(record):
+    return BeszelSystem.from_record(record, pb_timestamp(getattr(record, "updated", None)))
+
+
+def _record_age(record, now):
+    """Seconds between the ``created`` timestamp of a record and ``now``, None if unknown."""
+    created = pb_timestamp(getattr(record, "created", None))
+    try:
+        return max(0.0, (now - datetime.fromisoformat(created.replace("Z", "+00:00"))).total_seconds())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _stats_from_record(record):
+    if record is None:
+        return EMPTY_STATS
+    return BeszelStats.from_raw(getattr(record, "stats", None))
+
+
+class _BeszelCoordinatorBase(DataUpdateCoordinator):
+    """Shared plumbing of the systems and stats coordinators.
+
+    Times client calls, refreshes and entity updates into ``metrics``, backs
+    off exponentially while the hub is unreachable and coalesces realtime
+    changes into one debounced listener update.
+    """
+
+    # Key of this coordinator's refreshes in the metrics
+    _refresh_name = None
+
+    def __init__(self, hass, entry, client, name, interval, metrics):
+        # Realtime is only available on the native client
+        self.push = bool(entry.options.get(CONF_PUSH, False)) and hasattr(client, "subscribe")
+        self._min_interval = entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        self._max_interval = max(
+            entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL), self._min_interval
+        )
+        self._base_interval = timedelta(seconds=PUSH_CONSISTENCY_INTERVAL if self.push else interval)
+        super().__init__(
+            hass,
+            LOGGER,
+            name=name,
+            update_interval=self._base_interval,
+        )
+        self.client = client
+        self.metrics = metrics if metrics is not None else BeszelMetrics()
+        self._flush_handle = None
+
+    @property
+    def open_breakers(self):
+        """Ids of systems whose entities of this coordinator are unavailable."""
+        return frozenset()
+
+    async def _timed(self, call, awaitable):
+        """Await a client call, recording its latency and failure in the metrics."""
+        start = time.perf_counter()
+        try:
+            result = await awaitable
+        except Exception:
+            self.metrics.record_call(call, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.record_call(call, time.perf_counter() - start)
+        return result
+
+    def _back_off(self):
+        """Double the update interval, up to the maximum stats interval."""
+        self.update_interval = min(
+            self.update_interval * 2,
+            max(timedelta(seconds=self._max_interval), self._base_interval),
+        )
+
+    @callback
+    def async_update_listeners(self):
+        """Notify entities, timing how long they hold the event loop."""
+        start = time.perf_counter()
+        super().async_update_listeners()
+        self.metrics.record_entity_update(time.perf_counter() - start)
+
+    @callback
+    def _async_schedule_flush(self):
+        # Coalesce bursts of realtime events into one entity update
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(REALTIME_DEBOUNCE, self._async_flush)
+
+    @callback
+    def _async_flush(self):
+        self._flush_handle = None
+        # Listeners are notified without touching the poll schedule, so the
+        # consistency refresh still runs on time
+        self.async_update_listeners()
+
+    async def async_shutdown(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await super().async_shutdown()
+
+
+class BeszelCoordinator(_BeszelCoordinatorBase):
+    """Keeps the systems list of the Beszel hub: liveness and ``info`` values.
+
+    Data is a dict ``{"systems": {system_id: BeszelSystem}, "fleet": {group: BeszelFleet}}``;
+    records are normalized into the compact models once per refresh and
+    systems are keyed by id so entities resolve their record in O(1). Fleet
+    aggregates are computed once per update in a single pass, not per entity,
+    with GPU power from the latest stats.
+
+    This coordinator only queries the cheap ``systems`` collection, on the
+    (short) scan interval, so up/down changes are not held up by stats
+    queries. Stats live in the ``BeszelStatsCoordinator`` attached as
+    ``stats_coordinator``.
+
+    Systems are synced incrementally: after the first full fetch only records
+    updated since the newest known ``updated`` timestamp are requested, and a
+    periodic id-only query drops systems deleted on the hub.
+
+    Queries only ask for the fields read by the entities currently added to
+    Home Assistant, so disabled entities cost no bandwidth. The registry of
+    those fields is kept here for both coordinators.
+
+    In push mode the realtime listener patches the data of both coordinators
+    in place between the (then infrequent) consistency polls.
+
+    The last good systems and stats are persisted in compact form to
+    ``snapshot_store`` so entities can be created from it at startup before
+    the hub answers.
+    """
+
+    _refresh_name = "systems"
+
+    def __init__(self, hass, entry, client, snapshot_store=None, metrics=None):
+        super().__init__(
+            hass,
+            entry,
+            client,
+            "Beszel API",
+            entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            metrics,
+        )
+        if entry.options.get(CONF_PUSH, False) and not self.push:
+            LOGGER.warning("Push mode needs the native client, falling back to polling")
+        self._snapshot_store = snapshot_store
+        self.stats_coordinator = None
+        try:
+            self.fleet_groups = parse_groups(entry.options.get(CONF_FLEET_GROUPS, ""))
+        except ValueError as e:
+            LOGGER.warning(f"Ignoring fleet groups: {e}")
+            self.fleet_groups = {}
+        # Local copy of the systems collection and the newest `updated` seen in it
+        self._systems = {}
+        self._systems_updated = None
+        self._next_id_check = 0.0
+        # unique_id -> (system fields, stats fields) of every added entity
+        self._entity_fields = {}
+        self._fields_dirty = False
+
+    @property
+    def systems(self):
+        return self.data["systems"] if self.data else {}
+
+    def _stats(self):
+        stats_coordinator = self.stats_coordinator
+        return stats_coordinator.data["stats"] if stats_coordinator and stats_coordinator.data else {}
+
+    async def async_load_snapshot(self):
+        """Seed the data of both coordinators from the persisted snapshot.
+
+        Returns True if a snapshot was found; the live refreshes still have to run.
+        """
+        if self._snapshot_store is None:
+            return False
+        try:
+            stored = await self._snapshot_store.async_load()
+        except Exception as e:
+            LOGGER.warning(f"Failed to load Beszel snapshot: {e}")
+            return False
+        if not stored or not stored.get("systems"):
+            return False
+        try:
+            systems = {item["id"]: BeszelSystem(**item) for item in stored["systems"]}
+            stats = {
+                system_id: BeszelStats.from_snapshot(item)
+                for system_id, item in stored.get("stats", {}).items()
+            }
+        except Exception as e:
+            LOGGER.warning(f"Ignoring unreadable Beszel snapshot: {e}")
+            return False
+        if self.stats_coordinator is not None:
+            # Containers are not persisted, they come back with the first refresh
+            self.stats_coordinator.data = {"stats": stats, "containers": {}}
+        self.data = self._build_data(systems)
+        return True
+
+    def _build_data(self, systems):
+        return {
+            "systems": systems,
+            "fleet": compute_fleet(systems, self._stats(), self.fleet_groups),
+        }
+
+    @callback
+    def _snapshot_data(self):
+        """Compact copy of the current data: only what entities read."""
+        return {
+            "systems": [snapshot(system) for system in self.systems.values()],
+            "stats": {system_id: snapshot(stats) for system_id, stats in self._stats().items()},
+        }
+
+    @callback
+    def async_schedule_snapshot(self):
+        if self._snapshot_store is not None:
+            # Written once things settle, from whatever the data is by then
+            self._snapshot_store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_register_fields(self, unique_id, system_fields, stats_fields):
+        """Record the fields an entity reads; applied on the next refresh."""
+        self._entity_fields[unique_id] = (system_fields, stats_fields)
+        self._fields_dirty = True
+
+    @callback
+    def async_unregister_fields(self, unique_id):
+        if self._entity_fields.pop(unique_id, None) is not None:
+            self._fields_dirty = True
+
+    def apply_fields(self):
+        """Push the union of the registered fields down to the client."""
+        if not self._fields_dirty:
+            return
+        self._fields_dirty = False
+        if not self._entity_fields:
+            # Nothing registered yet: fetch everything
+            self.client.set_fields(None, None)
+        else:
+            system_fields = set(BASE_SYSTEM_FIELDS)
+            stats_fields = set(BASE_STATS_FIELDS)
+            for sys_f, stats_f in self._entity_fields.values():
+                system_fields.update(sys_f)
+                stats_fields.update(stats_f)
+            self.client.set_fields(system_fields, stats_fields)
+        # Cached systems may lack newly requested fields, resync them in full
+        self._systems_updated = None
+
+    async def _async_sync_systems(self):
+        """Bring the local copy of the systems collection up to date."""
+        now = time.monotonic()
+        if self._systems_updated is None:
+            systems = {
+                record.id: _system_from_record(record)
+                for record in await self._timed("get_systems", self.client.get_systems())
+            }
+            self._next_id_check = now + SYSTEMS_ID_CHECK_INTERVAL
+        else:
+            # Build a new dict so the data published by the last refresh stays untouched
+            systems = dict(self._systems)
+            updated = await self._timed(
+                "get_systems", self.client.get_systems(updated_after=self._systems_updated)
+            )
+            for record in updated:
+                systems[record.id] = _system_from_record(record)
+            if now >= self._next_id_check:
+                ids = await self._timed("get_system_ids", self.client.get_system_ids())
+                systems = {sid: system for sid, system in systems.items() if sid in ids}
+                self._next_id_check = now + SYSTEMS_ID_CHECK_INTERVAL
+
+        self._systems = systems
+        self._systems_updated = max(
+            filter(None, (system.updated for system in systems.values())), default=None
+        )
+        return systems
+
+    async def _async_update_data(self):
+        start = time.perf_counter()
+        try:
+            self.apply_fields()
+            systems = await self._async_sync_systems()
+            # The hub answered, end any backoff
+            self.update_interval = self._base_interval
+
+            if not systems:
+                LOGGER.warning("No systems found in Beszel API")
+            self.metrics.forget_systems(self.metrics.system_age.keys() - systems.keys())
+            self.async_schedule_snapshot()
+            self.metrics.record_refresh(self._refresh_name, time.perf_counter() - start)
+            return self._build_data(systems)
+        except Exception as err:
+            self._back_off()
+            LOGGER.error(f"Error fetching systems: {err}")
+            self.metrics.record_refresh(self._refresh_name, time.perf_counter() - start, error=True)
+            raise UpdateFailed(f"Error fetching systems: {err}")
+
+    def diagnostics(self):
+        """State of the polling schedule, for config entry diagnostics."""
+        systems = self.systems
+        return {
+            "last_update_success": self.last_update_success,
+            "update_interval_s": self.update_interval.total_seconds() if self.update_interval else None,
+            "push": self.push,
+            "systems": len(systems),
+            "systems_up": sum(1 for system in systems.values() if system.status == "up"),
+            "registered_entities": len(self._entity_fields),
+        }
+
+    @callback
+    def async_apply_realtime(self, collection, action, record):
+        """Apply one realtime record change to the data of the coordinator it belongs to."""
+        if collection == "system_stats":
+            if self.stats_coordinator is not None:
+                self.stats_coordinator.async_apply_realtime(action, record)
+            return
+        if collection != "systems" or self.data is None:
+            return
+        # Same dict as the local systems copy, so incremental sync sees the change too
+        systems = self.data["systems"]
+        if action == "delete":
+            systems.pop(record.id, None)
+        else:
+            systems[record.id] = _system_from_record(record)
+        self._async_schedule_flush()
+
+    @callback
+    def async_update_fleet(self):
+        """Recompute the fleet aggregates in place, e.g. after new stats.
+
+        Fleet entities pick the change up on the next systems update.
+        """
+        if self.data is not None:
+            self.data["fleet"] = compute_fleet(self.data["systems"], self._stats(), self.fleet_groups)
+
+    @callback
+    def _async_flush(self):
+        self.async_update_fleet()
+        super()._async_flush()
+
+    async def async_listen_realtime(self):
+        """Keep a realtime subscription open for as long as the entry is loaded.
+
+        Failed reconnects back off exponentially up to the maximum stats
+        interval; once a reconnect succeeds both coordinators refresh to pick
+        up changes missed meanwhile.
+        """
+        delay = REALTIME_RECONNECT_DELAY
+        reconnect = False
+        while True:
+            connected = False
+
+            @callback
+            def _on_connect():
+                nonlocal connected
+                connected = True
+                if reconnect:
+                    # Changes may have been missed while disconnected
+                    self.hass.async_create_task(self.async_request_refresh())
+                    if self.stats_coordinator is not None:
+                        self.hass.async_create_task(self.stats_coordinator.async_request_refresh())
+
+            try:
+                async for collection, action, record in self.client.subscribe(
+                    REALTIME_COLLECTIONS, on_connect=_on_connect
+                ):
+                    self.async_apply_realtime(collection, action, record)
+                LOGGER.debug("Realtime connection closed by the hub, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.warning(f"Realtime connection to Beszel failed: {e}")
+            reconnect = True
+            if connected:
+                delay = REALTIME_RECONNECT_DELAY
+            await asyncio.sleep(delay)
+            if not connected:
+                delay = min(delay * 2, max(self._max_interval, REALTIME_RECONNECT_DELAY))
+
+
+class BeszelStatsCoordinator(_BeszelCoordinatorBase):
+    """Fetches the latest ``system_stats`` of the systems known to ``systems_coordinator``.
+
+    Data is a dict ``{"stats": {system_id: BeszelStats}, "containers":
+    {system_id: {name: BeszelContainer}}}``. Only the GPU, EFS and container
+    entities listen to this coordinator, so the expensive stats queries run
+    on their own, slower schedule without delaying liveness.
+
+    Containers matching the ``container_include`` globs are read from the
+    newest ``container_stats`` record of every system that is up, fetched in
+    one bulk query per refresh; without globs the query is skipped.
+
+    Stats are scheduled per system: systems that are not up are skipped,
+    volatile systems are polled down to the minimum interval (the tick of
+    this coordinator) and stable ones back off towards the maximum.
+
+    A per-system circuit breaker keeps one bad agent from dragging down the
+    refresh: after ``BREAKER_THRESHOLD`` consecutive failures of its own
+    stats query a system is skipped for ``BREAKER_COOLDOWN`` seconds and its
+    stats entities are unavailable instead of showing empty values. Only
+    systems missing from a successful batched query are asked for directly;
+    if the batched query itself fails the whole refresh fails and backs off,
+    so a hub outage does not trip every system.
+    """
+
+    _refresh_name = "stats"
+
+    def __init__(self, hass, entry, client, systems_coordinator, metrics=None):
+        super().__init__(
+            hass,
+            entry,
+            client,
+            "Beszel API stats",
+            entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            metrics if metrics is not None else systems_coordinator.metrics,
+        )
+        self.systems_coordinator = systems_coordinator
+        systems_coordinator.stats_coordinator = self
+        # Realtime stats of other record types (the downsampled series) are ignored
+        self._stats_type = entry.options.get(CONF_STATS_TYPE, DEFAULT_STATS_TYPE)
+        # Bounds the per-system fallback queries running concurrently
+        self._semaphore = asyncio.Semaphore(
+            entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+        )
+        # Adaptive stats schedule: current interval and next due time per system
+        self._stats_interval = {}
+        self._stats_due = {}
+        # Circuit breaker: consecutive failures and end of the cooldown per system
+        self._failures = {}
+        self._breaker_until = {}
+        self.container_include = compile_globs((entry.options.get(CONF_CONTAINER_INCLUDE) or "").split(","))
+
+    @property
+    def systems(self):
+        return self.systems_coordinator.systems
+
+    @property
+    def open_breakers(self):
+        return frozenset(self._breaker_until)
+
+    @callback
+    def async_register_fields(self, unique_id, system_fields, stats_fields):
+        self.systems_coordinator.async_register_fields(unique_id, system_fields, stats_fields)
+
+    @callback
+    def async_unregister_fields(self, unique_id):
+        self.systems_coordinator.async_unregister_fields(unique_id)
+
+    async def _async_fetch_system_stats(self, system_id):
+        """Fetch the latest stats of one system, isolating failures to that system.
+
+        Returns None if the query failed.
+        """
+        async with self._semaphore:
+            try:
+                stats = await self._timed("get_system_stats", self.client.get_system_stats(system_id))
+            except Exception as e:
+                LOGGER.warning(f"Failed to fetch stats for system {system_id}: {e}")
+                return None
+        self._record_age(system_id, stats)
+        return _stats_from_record(stats)
+
+    def _record_age(self, system_id, record):
+        """Record how old the newest stats of a system are, to spot agents that lag."""
+        age = _record_age(record, datetime.now(timezone.utc)) if record is not None else None
+        if age is not None:
+            self.metrics.record_system_age(system_id, age)
+
+    async def _async_fetch_containers(self, systems, previous):
+        """Included containers of every system that is up, from one bulk query."""
+        if self.container_include is None:
+            return {}
+        up = [
+            system.id for system in systems.values()
+            if system.status == "up" and system.id not in self._breaker_until
+        ]
+        try:
+            latest = (
+                await self._timed(
+                    "get_latest_container_stats", self.client.get_latest_container_stats(up)
+                )
+                if up
+                else {}
+            )
+        except Exception as e:
+            LOGGER.warning(f"Container stats fetch failed, keeping the previous values: {e}")
+            return {sid: previous[sid] for sid in systems.keys() & previous.keys()}
+        containers = {}
+        for system_id in systems:
+            record = latest.get(system_id)
+            if record is not None:
+                containers[system_id] = containers_from_raw(
+                    getattr(record, "stats", None), self.container_include
+                )
+            elif system_id in previous:
+                # Nothing recent (e.g. the system is down): keep what we have
+                containers[system_id] = previous[system_id]
+        return containers
+
+    def _record_failure(self, system_id, now):
+        failures = self._failures.get(system_id, 0) + 1
+        self._failures[system_id] = failures
+        if failures >= BREAKER_THRESHOLD:
+            if system_id not in self._breaker_until:
+                LOGGER.warning(
+                    f"Stats of system {system_id} failed {failures} times in a row, "
+                    f"skipping it for {BREAKER_COOLDOWN} seconds"
+                )
+            self._breaker_until[system_id] = now + BREAKER_COOLDOWN
+
+    def _reschedule(self, system_id, old, new, now):
+        """Pick the next stats poll of a system from how much its stats moved."""
+        interval = self._stats_interval.get(system_id)
+        if interval is None or _is_volatile(old or EMPTY_STATS, new):
+            interval = self._min_interval if interval is None else max(self._min_interval, interval / 2)
+        else:
+            interval = min(self._max_interval, interval * 2)
+        self._stats_interval[system_id] = interval
+        # Half a tick of slack so a system is not missed by a slightly early tick
+        self._stats_due[system_id] = now + interval - self._base_interval.total_seconds() / 2
+
+    async def _async_update_data(self):
+        start = time.perf_counter()
+        try:
+            self.systems_coordinator.apply_fields()
+            systems = self.systems
+            now = time.monotonic()
+            previous = self.data["stats"] if self.data else {}
+            previous_containers = self.data["containers"] if self.data else {}
+
+            # Create a stats dictionary to store stats by system ID
+            stats_data = {}
+            due = []
+            for system in systems.values():
+                if (
+                    system.status != "up"
+                    or now < self._stats_due.get(system.id, 0)
+                    or now < self._breaker_until.get(system.id, 0)
+                ):
+                    # Not up (stats queries can only fail), not due yet or
+                    # failing: keep what we have
+                    stats_data[system.id] = previous.get(system.id, EMPTY_STATS)
+                else:
+                    due.append(system.id)
+
+            # Fetch the newest stats record of every due system in one batched query.
+            # If that fails the hub is unreachable: back off instead of querying
+            # every system on its own.
+            latest = (
+                await self._timed("get_latest_stats", self.client.get_latest_stats(due))
+                if due
+                else {}
+            )
+
+            # Systems with nothing recent in the batch window are asked for directly, in parallel
+            missing = [sid for sid in due if sid not in latest]
+            results = await asyncio.gather(*(self._async_fetch_system_stats(sid) for sid in missing))
+            fetched = dict(zip(missing, results))
+
+            for system_id, stats in latest.items():
+                self._record_age(system_id, stats)
+                fetched[system_id] = _stats_from_record(stats)
+
+            for system_id, stats in fetched.items():
+                if stats is None:
+                    # Keep the last good stats; entities go unavailable once the breaker opens
+                    stats_data[system_id] = previous.get(system_id, EMPTY_STATS)
+                    self._record_failure(system_id, now)
+                    continue
+                self._failures.pop(system_id, None)
+                self._breaker_until.pop(system_id, None)
+                self._reschedule(system_id, previous.get(system_id), stats, now)
+                # Store stats in the stats dictionary
+                stats_data[system_id] = stats
+
+            # Forget schedules of systems deleted on the hub
+            for schedule in (self._stats_interval, self._stats_due, self._failures, self._breaker_until):
+                for system_id in schedule.keys() - systems.keys():
+                    del schedule[system_id]
+
+            containers = await self._async_fetch_containers(systems, previous_containers)
+
+            self.update_interval = self._base_interval
+            self.systems_coordinator.async_schedule_snapshot()
+            self.metrics.record_refresh(self._refresh_name, time.perf_counter() - start)
+            return {"stats": stats_data, "containers": containers}
+        except Exception as err:
+            self._back_off()
+            LOGGER.error(f"Error fetching stats: {err}")
+            self.metrics.record_refresh(self._refresh_name, time.perf_counter() - start, error=True)
+            raise UpdateFailed(f"Error fetching stats: {err}")
+
+    def diagnostics(self):
+        """State of the stats schedule, for config entry diagnostics."""
+        intervals = list(self._stats_interval.values())
+        return {
+            "last_update_success": self.last_update_success,
+            "update_interval_s": self.update_interval.total_seconds() if self.update_interval else None,
+            "stats_interval_s": {
+                "min": min(intervals, default=None),
+                "max": max(intervals, default=None),
+                "mean": round(sum(intervals) / len(intervals), 1) if intervals else None,
+            },
+            "open_breakers": sorted(self._breaker_until),
+            "containers": sum(len(c) for c in self.data["containers"].values()) if self.data else 0,
+        }
+
+    @callback
+    def async_apply_realtime(self, action, record):
+        """Apply one realtime ``system_stats`` change to the data in place."""
+        if self.data is None or action != "create":
+            return
+        system_id = getattr(record, "system", None)
+        if system_id not in self.systems or getattr(record, "type", self._stats_type) != self._stats_type:
+            return
+        self.data["stats"][system_id] = _stats_from_record(record)
+        self._async_schedule_flush()
@@ -0,0 +1,22 @@
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DOMAIN, CONF_URL, CONF_USERNAME, CONF_PASSWORD
+
+TO_REDACT = {CONF_URL, CONF_USERNAME, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Return timing, request and payload metrics of a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    systems = coordinator.data["systems"] if coordinator.data else {}
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": coordinator.diagnostics(),
+        "stats_coordinator": coordinator.stats_coordinator.diagnostics(),
+        "metrics": coordinator.metrics.as_dict(
+            {system_id: system.name for system_id, system in systems.items()}
+        ),
+    }
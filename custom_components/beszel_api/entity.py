@@ -0,0 +1,87 @@
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+
+
+class BeszelEntity(CoordinatorEntity):
+    """Base for entities bound to one Beszel system."""
+
+    # Dotted fields of the system record and of its latest stats record that
+    # this entity reads; the coordinator only downloads fields some entity uses
+    _system_fields = ()
+    _stats_fields = ()
+    # Numeric changes smaller than this (in the value's unit) are not written
+    _deadband = 0
+
+    def __init__(self, coordinator, system):
+        super().__init__(coordinator)
+        self._system_id = system.id
+        self._last_written = None
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.coordinator.async_register_fields(self.unique_id, self._system_fields, self._stats_fields)
+        # Home Assistant writes the initial state right after this
+        self._last_written = self._state_snapshot()
+
+    async def async_will_remove_from_hass(self):
+        self.coordinator.async_unregister_fields(self.unique_id)
+        await super().async_will_remove_from_hass()
+
+    def _state_value(self):
+        """The primary value of the entity, compared with the deadband."""
+        return None
+
+    def _state_snapshot(self):
+        return (self.available, self.name, self._state_value(), self.extra_state_attributes)
+
+    def _is_unchanged(self, snapshot):
+        last = self._last_written
+        if last is None or last[0:2] != snapshot[0:2] or last[3] != snapshot[3]:
+            return False
+        old, new = last[2], snapshot[2]
+        if old == new:
+            return True
+        if self._deadband and isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            return abs(new - old) < self._deadband
+        return False
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only when something visible actually changed."""
+        snapshot = self._state_snapshot()
+        if self._is_unchanged(snapshot):
+            return
+        self._last_written = snapshot
+        self.async_write_ha_state()
+
+    @property
+    def available(self):
+        # Systems removed from the hub leave their entities unavailable, as do
+        # systems whose stats are failing while they are skipped
+        return (
+            super().available
+            and self.system is not None
+            and self._system_id not in self.coordinator.open_breakers
+        )
+
+    @property
+    def system(self):
+        # Systems are keyed by id, so this is a dict lookup; the stats
+        # coordinator forwards to the systems coordinator
+        return self.coordinator.systems.get(self._system_id)
+
+    @property
+    def device_info(self):
+        sys = self.system
+        if sys is None:
+            return None
+        return {
+            "identifiers": {(DOMAIN, sys.id)},
+            "name": sys.name,
+            "manufacturer": "Beszel",
+            "model": sys.model,
+            "sw_version": sys.version,
+            "hw_version": sys.kernel,
+        }
@@ -0,0 +1,133 @@
+import fnmatch
+import re
+from dataclasses import dataclass
+
+# Group every system belongs to
+FLEET_ALL = "all"
+
+
+def compile_globs(globs):
+    """Compile shell-style globs into one case-insensitive regex, None if there are none."""
+    globs = [glob.strip() for glob in globs if glob.strip()]
+    if not globs:
+        return None
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs), re.IGNORECASE)
+
+
+def parse_groups(text):
+    """Parse ``name=pattern, other=pattern`` into ``{key: (name, regex)}``.
+
+    Patterns are shell-style globs matched case-insensitively against system
+    names; ``key`` is the name reduced to a slug for unique ids. Raises
+    ValueError on malformed input.
+    """
+    groups = {}
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        name, sep, pattern = (p.strip() for p in part.partition("="))
+        key = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+        if not sep or not key or not pattern or key == FLEET_ALL or key in groups:
+            raise ValueError(f"Invalid fleet group: {part}")
+        groups[key] = (name, compile_globs([pattern]))
+    return groups
+
+
+@dataclass(slots=True)
+class BeszelFleet:
+    """Aggregates over the systems of one group; metrics cover systems that are up."""
+
+    hosts: int = 0
+    up: int = 0
+    down: int = 0
+    cpu_mean: float | None = None
+    cpu_max: float | None = None
+    ram_mean: float | None = None
+    ram_max: float | None = None
+    disk_mean: float | None = None
+    disk_max: float | None = None
+    bandwidth: float | None = None
+    hottest_host: str | None = None
+    hottest_temp: float | None = None
+    gpu_power: float | None = None
+
+
+class _Accumulator:
+    __slots__ = (
+        "hosts", "up", "cpu", "cpu_n", "cpu_max", "ram", "ram_n", "ram_max",
+        "disk", "disk_n", "disk_max", "bandwidth", "hottest", "gpu_power",
+    )
+
+    def __init__(self):
+        self.hosts = self.up = self.cpu_n = self.ram_n = self.disk_n = 0
+        self.cpu = self.ram = self.disk = 0.0
+        self.cpu_max = self.ram_max = self.disk_max = None
+        self.bandwidth = self.gpu_power = None
+        self.hottest = None
+
+    def add(self, system, gpu_power):
+        self.hosts += 1
+        if system.status != "up":
+            return
+        self.up += 1
+        if system.cpu is not None:
+            self.cpu += system.cpu
+            self.cpu_n += 1
+            self.cpu_max = system.cpu if self.cpu_max is None else max(self.cpu_max, system.cpu)
+        if system.mp is not None:
+            self.ram += system.mp
+            self.ram_n += 1
+            self.ram_max = system.mp if self.ram_max is None else max(self.ram_max, system.mp)
+        if system.dp is not None:
+            self.disk += system.dp
+            self.disk_n += 1
+            self.disk_max = system.dp if self.disk_max is None else max(self.disk_max, system.dp)
+        if system.b is not None:
+            self.bandwidth = (self.bandwidth or 0) + system.b
+        if system.dt is not None and (self.hottest is None or system.dt > self.hottest.dt):
+            self.hottest = system
+        if gpu_power is not None:
+            self.gpu_power = (self.gpu_power or 0) + gpu_power
+
+    def summary(self):
+        return BeszelFleet(
+            hosts=self.hosts,
+            up=self.up,
+            down=self.hosts - self.up,
+            cpu_mean=round(self.cpu / self.cpu_n, 2) if self.cpu_n else None,
+            cpu_max=self.cpu_max,
+            ram_mean=round(self.ram / self.ram_n, 2) if self.ram_n else None,
+            ram_max=self.ram_max,
+            disk_mean=round(self.disk / self.disk_n, 2) if self.disk_n else None,
+            disk_max=self.disk_max,
+            bandwidth=round(self.bandwidth, 2) if self.bandwidth is not None else None,
+            hottest_host=self.hottest.name if self.hottest else None,
+            hottest_temp=self.hottest.dt if self.hottest else None,
+            gpu_power=round(self.gpu_power, 2) if self.gpu_power is not None else None,
+        )
+
+
+def _gpu_power(stats):
+    """Total GPU power of one system: per-GPU power, else the GT power domain."""
+    if stats is None:
+        return None
+    powers = [gpu.power for gpu in stats.gpus.values() if gpu.power is not None]
+    return sum(powers) if powers else stats.gpu_domain_power
+
+
+def compute_fleet(systems, stats, groups):
+    """Aggregate all groups in a single pass over the systems.
+
+    ``systems``/``stats`` are the coordinator dicts keyed by system id and
+    ``groups`` comes from ``parse_groups``. Returns ``{group key: BeszelFleet}``
+    including ``FLEET_ALL``.
+    """
+    accumulators = {FLEET_ALL: _Accumulator()}
+    for key in groups:
+        accumulators[key] = _Accumulator()
+    everyone = accumulators[FLEET_ALL]
+    for system_id, system in systems.items():
+        gpu_power = _gpu_power(stats.get(system_id))
+        everyone.add(system, gpu_power)
+        for key, (_, pattern) in groups.items():
+            if pattern.match(system.name or ""):
+                accumulators[key].add(system, gpu_power)
+    return {key: acc.summary() for key, acc in accumulators.items()}
@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+
+# Upper bounds (seconds) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# How many systems the stalest-systems report lists
+STALEST_SYSTEMS = 10
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; constant memory however long it runs."""
+
+    __slots__ = ("buckets", "count", "total", "max", "last")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = None
+
+    def record(self, seconds):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(LATENCY_BUCKETS)
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile, in seconds."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                # Never report more than was actually observed
+                return min(LATENCY_BUCKETS[i], self.max) if i < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self):
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        labels = [f"<={b * 1000:g}ms" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1] * 1000:g}ms"]
+        return {
+            "count": self.count,
+            "last_ms": ms(self.last),
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "p50_ms": ms(self.percentile(0.5)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "max_ms": ms(self.max) if self.count else None,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class BeszelMetrics:
+    """Counters and latency histograms of one config entry, since it was loaded.
+
+    The coordinators record client calls, their refreshes (keyed by
+    coordinator, ``systems`` or ``stats``) and the time spent notifying
+    entities; the native client records raw HTTP requests and the bytes it
+    received.
+    """
+
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self.calls = {}
+        self.call_errors = {}
+        self.requests = 0
+        self.request_errors = 0
+        self.bytes_received = 0
+        self.refresh = {}
+        self.refresh_errors = {}
+        self.last_refresh = None
+        self.entity_updates = LatencyHistogram()
+        # system id -> age (seconds) of its newest stats on the hub when last fetched;
+        # an agent that stops reporting shows up here while its system is still up
+        self.system_age = {}
+
+    def record_call(self, call, seconds, error=False):
+        histogram = self.calls.get(call)
+        if histogram is None:
+            histogram = self.calls[call] = LatencyHistogram()
+        histogram.record(seconds)
+        if error:
+            self.call_errors[call] = self.call_errors.get(call, 0) + 1
+
+    def record_request(self, nbytes):
+        self.requests += 1
+        self.bytes_received += nbytes
+
+    def record_request_error(self):
+        self.requests += 1
+        self.request_errors += 1
+
+    def record_refresh(self, name, seconds, error=False):
+        histogram = self.refresh.get(name)
+        if histogram is None:
+            histogram = self.refresh[name] = LatencyHistogram()
+        histogram.record(seconds)
+        self.last_refresh = datetime.now(timezone.utc)
+        if error:
+            self.refresh_errors[name] = self.refresh_errors.get(name, 0) + 1
+
+    def record_entity_update(self, seconds):
+        self.entity_updates.record(seconds)
+
+    def record_system_age(self, system_id, seconds):
+        self.system_age[system_id] = seconds
+
+    def forget_systems(self, system_ids):
+        for system_id in system_ids:
+            self.system_age.pop(system_id, None)
+
+    def stalest_systems(self, count=STALEST_SYSTEMS):
+        """``(system_id, seconds)`` of the systems with the oldest stats, oldest first."""
+        return sorted(self.system_age.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def as_dict(self, names=None):
+        """Plain-dict report for diagnostics; ``names`` maps system ids to names."""
+        names = names or {}
+        return {
+            "since": self.started.isoformat(),
+            "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            "refresh": {
+                name: {**histogram.as_dict(), "errors": self.refresh_errors.get(name, 0)}
+                for name, histogram in sorted(self.refresh.items())
+            },
+            "entity_updates": self.entity_updates.as_dict(),
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "bytes_received": self.bytes_received,
+            "calls": {
+                call: {**histogram.as_dict(), "errors": self.call_errors.get(call, 0)}
+                for call, histogram in sorted(self.calls.items())
+            },
+            "stalest_systems": [
+                {"id": system_id, "name": names.get(system_id), "age_s": round(seconds)}
+                for system_id, seconds in self.stalest_systems()
+            ],
+        }
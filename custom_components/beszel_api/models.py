@@ -0,0 +1,198 @@
+from dataclasses import asdict, dataclass, field
+
+
+def _num(value):
+    """Return value if it is a number, else None."""
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _first_power_domain(domains, needles):
+    """First numeric power domain whose key contains one of ``needles``."""
+    for key, value in domains.items():
+        k = str(key).lower()
+        if any(s in k for s in needles) and _num(value) is not None:
+            return value
+    return None
+
+
+@dataclass(slots=True)
+class BeszelSystem:
+    """A ``systems`` record reduced to the fields the entities read."""
+
+    id: str
+    name: str
+    status: str | None = None
+    updated: str | None = None
+    cpu: float | None = None
+    mp: float | None = None
+    dp: float | None = None
+    b: float | None = None
+    dt: float | None = None
+    u: float | None = None
+    model: str | None = None
+    version: str | None = None
+    kernel: str | None = None
+
+    @classmethod
+    def from_record(cls, record, updated=None):
+        info = _dict(getattr(record, "info", None))
+        return cls(
+            id=record.id,
+            name=getattr(record, "name", None) or record.id,
+            status=getattr(record, "status", None),
+            updated=updated,
+            cpu=_num(info.get("cpu")),
+            mp=_num(info.get("mp")),
+            dp=_num(info.get("dp")),
+            b=_num(info.get("b")),
+            dt=_num(info.get("dt")),
+            u=_num(info.get("u")),
+            model=info.get("m"),
+            version=info.get("v"),
+            kernel=info.get("k"),
+        )
+
+
+@dataclass(slots=True)
+class BeszelDisk:
+    total: float | None = None
+    used: float | None = None
+    read: float | None = None
+    write: float | None = None
+
+
+@dataclass(slots=True)
+class BeszelGpu:
+    name: str | None = None
+    usage: float | None = None
+    power: float | None = None
+    package_power: float | None = None
+    mem_used: float | None = None
+    mem_total: float | None = None
+    # Engine name -> utilization, taken from whichever engine map the agent sends
+    engines: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_raw(cls, raw):
+        raw = _dict(raw)
+        engines = {}
+        # Try a few likely field names for engine map
+        for k in ("e", "eng", "engines", "ge", "engine_util", "engine"):
+            if isinstance(raw.get(k), dict):
+                engines = raw[k]
+                break
+        package_power = None
+        # Some agents may stash package power next to GPU values (rare)
+        for k in ("pp", "package", "pkg"):
+            if _num(raw.get(k)) is not None:
+                package_power = raw[k]
+                break
+        return cls(
+            name=raw.get("n"),
+            usage=_num(raw.get("u")),
+            power=_num(raw.get("p")),
+            package_power=package_power,
+            mem_used=_num(raw.get("mu")),
+            mem_total=_num(raw.get("mt")),
+            engines=engines,
+        )
+
+
+@dataclass(slots=True)
+class BeszelStats:
+    """A ``system_stats`` record with its GPU, EFS and temperature maps pre-parsed."""
+
+    cpu: float | None = None
+    mp: float | None = None
+    dp: float | None = None
+    efs: dict = field(default_factory=dict)
+    gpus: dict = field(default_factory=dict)
+    # Flat temperature map: label -> °C
+    temps: dict = field(default_factory=dict)
+    # GT/GPU and package power picked from a top-level power-domain map, if any
+    gpu_domain_power: float | None = None
+    package_domain_power: float | None = None
+
+    @classmethod
+    def from_raw(cls, raw):
+        raw = _dict(raw)
+        domains = {}
+        # Heuristic: some agents expose a top-level power domain map; try common keys.
+        for k in ("power", "pd", "rapl", "pwr"):
+            if isinstance(raw.get(k), dict):
+                domains = raw[k]
+                break
+        return cls(
+            cpu=_num(raw.get("cpu")),
+            mp=_num(raw.get("mp")),
+            dp=_num(raw.get("dp")),
+            efs={
+                str(name): BeszelDisk(
+                    total=_num(d.get("d")),
+                    used=_num(d.get("du")),
+                    read=_num(d.get("r")),
+                    write=_num(d.get("w")),
+                )
+                for name, d in _dict(raw.get("efs")).items()
+                if isinstance(d, dict)
+            },
+            gpus={str(key): BeszelGpu.from_raw(g) for key, g in _dict(raw.get("g")).items()},
+            temps={k: v for k, v in _dict(raw.get("t")).items() if _num(v) is not None},
+            gpu_domain_power=_first_power_domain(domains, ("gpu", "gt", "graphics", "gfx")),
+            package_domain_power=_first_power_domain(
+                domains, ("package", "pkg", "rapl_package", "rapl:package")
+            ),
+        )
+
+    @classmethod
+    def from_snapshot(cls, data):
+        data = dict(data)
+        data["efs"] = {k: BeszelDisk(**v) for k, v in data.get("efs", {}).items()}
+        data["gpus"] = {k: BeszelGpu(**v) for k, v in data.get("gpus", {}).items()}
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class BeszelContainer:
+    """One container entry of a ``container_stats`` record."""
+
+    name: str
+    cpu: float | None = None
+    # MB
+    mem: float | None = None
+    # MB/s
+    net_sent: float | None = None
+    net_recv: float | None = None
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            name=str(raw.get("n")),
+            cpu=_num(raw.get("c")),
+            mem=_num(raw.get("m")),
+            net_sent=_num(raw.get("ns")),
+            net_recv=_num(raw.get("nr")),
+        )
+
+
+def containers_from_raw(raw, include):
+    """``{name: BeszelContainer}`` of the containers in ``raw`` whose name matches ``include``."""
+    containers = {}
+    for item in raw if isinstance(raw, list) else ():
+        if isinstance(item, dict) and item.get("n") and include.match(str(item["n"])):
+            container = BeszelContainer.from_raw(item)
+            containers[container.name] = container
+    return containers
+
+
+# Shared stand-in for systems without stats; never mutated
+EMPTY_STATS = BeszelStats()
+
+
+def snapshot(model):
+    """Plain-dict form of a model for ``.storage``."""
+    return asdict(model)
@@ -3,119 +3,235 @@ from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorStateClass,
 )
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.icon import icon_for_battery_level
 
-from .const import DOMAIN, LOGGER
+from .const import (
+    DOMAIN, LOGGER, SENSOR_FAMILIES, CONF_ENABLE_GPU_ENGINES, CONF_ENABLE_GPU_POWER_SPLIT,
+    CONF_ENABLE_EFS, CONF_ENABLE_TEMPERATURE, CONF_ENABLE_FLEET, CONF_CONTAINER_INCLUDE,
+)
+from .entity import BeszelEntity
+from .fleet import FLEET_ALL
+from .models import EMPTY_STATS
+
 
-def _get_system_by_id(coordinator, sid):
-    systems = coordinator.data.get("systems", [])
-    for s in systems:
-        if s.id == sid:
-            return s
+def _family_of(unique_id):
+    """Return the optional sensor family a unique_id belongs to, or None for core sensors."""
+    parts = unique_id.split("_", 2)
+    if len(parts) < 3:
+        return None
+    rest = parts[2]
+    if rest.startswith("fleet_"):
+        return CONF_ENABLE_FLEET
+    if rest.startswith("efs_"):
+        return CONF_ENABLE_EFS
+    if rest.startswith("container_"):
+        return CONF_CONTAINER_INCLUDE
+    if rest == "temperature" or (rest.startswith("gpu_") and rest.endswith("_temp")):
+        return CONF_ENABLE_TEMPERATURE
+    if rest.startswith("gpu_") and rest.endswith(("_power_tile", "_power_package")):
+        return CONF_ENABLE_GPU_POWER_SPLIT
+    if rest.startswith("gpu_") and "_eng_" in rest:
+        return CONF_ENABLE_GPU_ENGINES
     return None
 
-async def async_setup_entry(hass, entry, async_add_entities):
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+def _container_of(unique_id):
+    """Return the container name of a container sensor's unique_id, or None."""
+    rest = unique_id.split("_", 2)[-1]
+    if not rest.startswith("container_"):
+        return None
+    for sensor in CONTAINER_SENSORS:
+        if rest.endswith(f"_{sensor._key}"):
+            return rest[len("container_"):-len(sensor._key) - 1]
+    return None
+
+
+def _new_entities(coordinator, stats_coordinator, known, families):
+    """Create entities for systems, EFS disks, GPUs and containers not in ``known`` yet.
+
+    ``known`` holds the keys already handled and is updated in place, so
+    calling this after every refresh only creates what is new. Only sensors
+    of the enabled ``families`` are created. Core sensors follow the systems
+    ``coordinator``, EFS, GPU and container sensors the ``stats_coordinator``.
+    """
     entities = []
 
-    try:
-        # Get systems and stats from coordinator data
-        systems = coordinator.data.get("systems", [])
-        stats_data = coordinator.data.get("stats", {})
+    # Get systems and stats from coordinator data
+    systems = coordinator.systems.values()
+    stats_data = stats_coordinator.data["stats"] if stats_coordinator.data else {}
+    containers_data = stats_coordinator.data["containers"] if stats_coordinator.data else {}
 
-        for system in systems:
-            try:
+    for system in systems:
+        try:
+            if ("system", system.id) not in known:
                 # Core system sensors
                 entities.append(BeszelCPUSensor(coordinator, system))
                 entities.append(BeszelRAMSensor(coordinator, system))
                 entities.append(BeszelDiskSensor(coordinator, system))
                 entities.append(BeszelBandwidthSensor(coordinator, system))
-                entities.append(BeszelTemperatureSensor(coordinator, system))
+                if CONF_ENABLE_TEMPERATURE in families:
+                    entities.append(BeszelTemperatureSensor(coordinator, system))
                 entities.append(BeszelUptimeSensor(coordinator, system))
+                known.add(("system", system.id))
+
+            # Per-system stats
+            system_stats = stats_data.get(system.id, EMPTY_STATS)
+
+            # ---- EFS sensors (existing) ----
+            if CONF_ENABLE_EFS in families:
+                for disk_name in system_stats.efs:
+                    if ("efs", system.id, disk_name) in known:
+                        continue
+                    entities.append(BeszelEFSDiskSensor(stats_coordinator, system, disk_name))
+                    # Throughput (MB/s)
+                    entities.append(BeszelEFSDiskReadSensor(stats_coordinator, system, disk_name))
+                    entities.append(BeszelEFSDiskWriteSensor(stats_coordinator, system, disk_name))
+                    known.add(("efs", system.id, disk_name))
+                    LOGGER.info(f"Created EFS sensor for {system.name} - {disk_name}")
+
+            # ---- GPU sensors (NEW) ----
+            # Parsed from system_stats["g"] = { "<gpu_key>": { "n","u","p","mu","mt" } }
+            if system_stats.gpus:
+                for gpu_key, gpu in system_stats.gpus.items():
+                    if ("gpu", system.id, gpu_key) in known:
+                        continue
+                    try:
+                        gpu_name = gpu.name or f"GPU {gpu_key}"
+                        # Usage (%)
+                        entities.append(BeszelGPUSensorUsage(stats_coordinator, system, gpu_key, gpu_name))
+                        # Power (W) - may be None for some iGPU setups
+                        entities.append(BeszelGPUSensorPower(stats_coordinator, system, gpu_key, gpu_name))
+                        # Power (split)
+                        if CONF_ENABLE_GPU_POWER_SPLIT in families:
+                            entities.append(BeszelGPUSensorPowerTile(stats_coordinator, system, gpu_key, gpu_name))
+                            entities.append(BeszelGPUSensorPowerPackage(stats_coordinator, system, gpu_key, gpu_name))
+                        # Memory used / total (MB or None depending on exporter)
+                        entities.append(BeszelGPUSensorMemUsed(stats_coordinator, system, gpu_key, gpu_name))
+                        entities.append(BeszelGPUSensorMemTotal(stats_coordinator, system, gpu_key, gpu_name))
+                        # Temperature (best-effort from temp map)
+                        if CONF_ENABLE_TEMPERATURE in families:
+                            entities.append(BeszelGPUSensorTemp(stats_coordinator, system, gpu_key, gpu_name))
+                        # Engine utilizations
+                        if CONF_ENABLE_GPU_ENGINES in families:
+                            entities.append(BeszelGPUEngineRender(stats_coordinator, system, gpu_key, gpu_name, "render"))
+                            entities.append(BeszelGPUEngineBlitter(stats_coordinator, system, gpu_key, gpu_name, "blitter"))
+                            entities.append(BeszelGPUEngineVideo(stats_coordinator, system, gpu_key, gpu_name, "video"))
+                            entities.append(BeszelGPUEngineVideoEnhance(stats_coordinator, system, gpu_key, gpu_name, "videoenhance"))
+                        known.add(("gpu", system.id, gpu_key))
+                        LOGGER.info(f"Created GPU sensors for {system.name} - {gpu_name} ({gpu_key})")
+                    except Exception as ge:
+                        LOGGER.error(f"Failed to create GPU sensors for {system.name} ({gpu_key}): {ge}")
+                        continue
+
+            # ---- Container sensors ----
+            # Only containers matching the include globs are in the data
+            for container_name in containers_data.get(system.id, {}):
+                if ("container", system.id, container_name) in known:
+                    continue
+                entities.extend(
+                    sensor(stats_coordinator, system, container_name) for sensor in CONTAINER_SENSORS
+                )
+                known.add(("container", system.id, container_name))
+
+        except Exception as e:
+            LOGGER.error(f"Failed to create sensors for system {getattr(system, 'name', 'unknown')}: {e}")
+            continue
+
+    return entities
 
-                # Per-system stats
-                system_stats = stats_data.get(system.id, {}) if stats_data else {}
-
-                # ---- EFS sensors (existing) ----
-                if system_stats and isinstance(system_stats.get("efs"), dict):
-                    for disk_name in system_stats["efs"].keys():
-                        entities.append(BeszelEFSDiskSensor(coordinator, system, disk_name, system_stats))
-                        LOGGER.info(f"Created EFS sensor for {system.name} - {disk_name}")
-
-                # ---- GPU sensors (NEW) ----
-                # Expect system_stats["g"] = { "<gpu_key>": { "n","u","p","mu","mt" } }
-                gmap = system_stats.get("g") if isinstance(system_stats, dict) else None
-                if isinstance(gmap, dict) and gmap:
-                    # Temps are in a flat temp map: system_stats["t"] = { label: value_C }
-                    tmap = system_stats.get("t") if isinstance(system_stats.get("t"), dict) else {}
-
-                    for gpu_key, gvals in gmap.items():
-                        try:
-                            gpu_name = gvals.get("n") or f"GPU {gpu_key}"
-                            # Usage (%)
-                            entities.append(BeszelGPUSensorUsage(coordinator, system, gpu_key, gpu_name))
-                            # Power (W) - may be None for some iGPU setups
-                            entities.append(BeszelGPUSensorPower(coordinator, system, gpu_key, gpu_name))
-                            # Power (split)
-                            entities.append(BeszelGPUSensorPowerTile(coordinator, system, gpu_key, gpu_name))
-                            entities.append(BeszelGPUSensorPowerPackage(coordinator, system, gpu_key, gpu_name))
-                            # Memory used / total (MB or None depending on exporter)
-                            entities.append(BeszelGPUSensorMemUsed(coordinator, system, gpu_key, gpu_name))
-                            entities.append(BeszelGPUSensorMemTotal(coordinator, system, gpu_key, gpu_name))
-                            # Temperature (best-effort from temp map)
-                            entities.append(BeszelGPUSensorTemp(coordinator, system, gpu_key, gpu_name))
-                            # Engine utilizations
-                            entities.append(BeszelGPUEngineRender(coordinator, system, gpu_key, gpu_name, "render"))
-                            entities.append(BeszelGPUEngineBlitter(coordinator, system, gpu_key, gpu_name, "blitter"))
-                            entities.append(BeszelGPUEngineVideo(coordinator, system, gpu_key, gpu_name, "video"))
-                            entities.append(BeszelGPUEngineVideoEnhance(coordinator, system, gpu_key, gpu_name, "videoenhance"))
-                            LOGGER.info(f"Created GPU sensors for {system.name} - {gpu_name} ({gpu_key})")
-                        except Exception as ge:
-                            LOGGER.error(f"Failed to create GPU sensors for {system.name} ({gpu_key}): {ge}")
-                            continue
-
-            except Exception as e:
-                LOGGER.error(f"Failed to create sensors for system {getattr(system, 'name', 'unknown')}: {e}")
-                continue
 
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    stats_coordinator = coordinator.stats_coordinator
+    known = set()
+    families = {family for family in SENSOR_FAMILIES if entry.options.get(family, True)}
+    if stats_coordinator.container_include is not None:
+        families.add(CONF_CONTAINER_INCLUDE)
+
+    # Drop registry entries of families that were switched off, and of
+    # containers the include globs no longer match
+    registry = er.async_get(hass)
+    for reg_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if reg_entry.domain != "sensor":
+            continue
+        family = _family_of(reg_entry.unique_id)
+        if family is not None and family not in families:
+            registry.async_remove(reg_entry.entity_id)
+        elif family == CONF_CONTAINER_INCLUDE:
+            container_name = _container_of(reg_entry.unique_id)
+            if container_name is not None and not stats_coordinator.container_include.match(container_name):
+                registry.async_remove(reg_entry.entity_id)
+
+    try:
+        entities = _new_entities(coordinator, stats_coordinator, known, families)
         LOGGER.info(f"Created {len(entities)} sensors total")
+        # Coordinator health sensors; disabled by default
+        entities.extend(sensor(coordinator, entry) for sensor in HUB_SENSORS)
+        if CONF_ENABLE_FLEET in families:
+            for group in (FLEET_ALL, *coordinator.fleet_groups):
+                entities.extend(
+                    BeszelFleetSensor(coordinator, entry, group, *spec) for spec in FLEET_SENSORS
+                )
+                entities.append(BeszelFleetHottestSensor(coordinator, entry, group))
         async_add_entities(entities)
-
     except Exception as e:
         LOGGER.error(f"Failed to setup sensors: {e}")
         raise
 
+    @callback
+    def _async_discover():
+        """Add entities for systems, disks, GPUs and containers that appeared since the last refresh."""
+        if not coordinator.data:
+            return
+        entities = _new_entities(coordinator, stats_coordinator, known, families)
+        if entities:
+            LOGGER.info(f"Discovered {len(entities)} new sensors")
+            async_add_entities(entities)
+
+    # New systems show up in the systems list, new disks, GPUs and containers in the stats
+    entry.async_on_unload(coordinator.async_add_listener(_async_discover))
+    entry.async_on_unload(stats_coordinator.async_add_listener(_async_discover))
+
+    # Keep the disk and GPU maps in the projected queries so new ones are noticed
+    discovery_fields = ("stats.g", "stats.efs") if CONF_ENABLE_EFS in families else ("stats.g",)
+    coordinator.async_register_fields("sensor_discovery", (), discovery_fields)
+    entry.async_on_unload(lambda: coordinator.async_unregister_fields("sensor_discovery"))
+
+    if CONF_ENABLE_FLEET in families:
+        coordinator.async_register_fields(
+            "fleet",
+            ("info.cpu", "info.mp", "info.dp", "info.b", "info.dt"),
+            ("stats.g", "stats.power", "stats.pd", "stats.rapl", "stats.pwr"),
+        )
+        entry.async_on_unload(lambda: coordinator.async_unregister_fields("fleet"))
+        # Fleet GPU power comes from the stats
+        entry.async_on_unload(stats_coordinator.async_add_listener(coordinator.async_update_fleet))
+
+
+class BeszelBaseSensor(BeszelEntity, SensorEntity):
+    """Base for all Beszel sensors."""
+
+    def _state_value(self):
+        return self.native_value
 
-class BeszelBaseSensor(CoordinatorEntity, SensorEntity):
-    def __init__(self, coordinator, system):
-        super().__init__(coordinator)
-        self._system_id = system.id
-
-    @property
-    def system(self):
-        return _get_system_by_id(self.coordinator, self._system_id)
-
-    @property
-    def device_info(self):
-        sys = self.system
-        if sys is None:
-            return None
-        info = getattr(sys, "info", {})
-        return {
-            "identifiers": {(DOMAIN, sys.id)},
-            "name": sys.name,
-            "manufacturer": "Beszel",
-            "model": info.get("m"),
-            "sw_version": info.get("v"),
-            "hw_version": info.get("k"),
-        }
+    def _system_stats(self):
+        """Latest stats of this system from the current coordinator data."""
+        # Only disk and GPU sensors read stats; they follow the stats coordinator
+        return self.coordinator.data["stats"].get(self._system_id, EMPTY_STATS)
 
 # ----------------------
 # Core (existing) sensors
 # ----------------------
 
 class BeszelCPUSensor(BeszelBaseSensor):
+    _system_fields = ("info.cpu",)
+    _deadband = 0.5
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_cpu"
@@ -130,7 +246,7 @@ class BeszelCPUSensor(BeszelBaseSensor):
 
     @property
     def native_value(self):
-        return self.system.info.get("cpu") if self.system else None
+        return self.system.cpu if self.system else None
 
     @property
     def native_unit_of_measurement(self):
@@ -138,6 +254,8 @@ class BeszelCPUSensor(BeszelBaseSensor):
 
 
 class BeszelRAMSensor(BeszelBaseSensor):
+    _system_fields = ("info.mp",)
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_ram"
@@ -152,7 +270,7 @@ class BeszelRAMSensor(BeszelBaseSensor):
 
     @property
     def native_value(self):
-        return self.system.info.get("mp") if self.system else None
+        return self.system.mp if self.system else None
 
     @property
     def native_unit_of_measurement(self):
@@ -160,6 +278,8 @@ class BeszelRAMSensor(BeszelBaseSensor):
 
 
 class BeszelDiskSensor(BeszelBaseSensor):
+    _system_fields = ("info.dp",)
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_disk"
@@ -174,7 +294,7 @@ class BeszelDiskSensor(BeszelBaseSensor):
 
     @property
     def native_value(self):
-        return self.system.info.get("dp") if self.system else None
+        return self.system.dp if self.system else None
 
     @property
     def native_unit_of_measurement(self):
@@ -182,6 +302,8 @@ class BeszelDiskSensor(BeszelBaseSensor):
 
 
 class BeszelBandwidthSensor(BeszelBaseSensor):
+    _system_fields = ("info.b",)
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_bandwidth"
@@ -196,7 +318,7 @@ class BeszelBandwidthSensor(BeszelBaseSensor):
 
     @property
     def native_value(self):
-        return self.system.info.get("b") if self.system else None
+        return self.system.b if self.system else None
 
     @property
     def native_unit_of_measurement(self):
@@ -204,6 +326,8 @@ class BeszelBandwidthSensor(BeszelBaseSensor):
 
 
 class BeszelTemperatureSensor(BeszelBaseSensor):
+    _system_fields = ("info.dt",)
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_temperature"
@@ -214,7 +338,7 @@ class BeszelTemperatureSensor(BeszelBaseSensor):
 
     @property
     def native_value(self):
-        return self.system.info.get("dt") if self.system else None
+        return self.system.dt if self.system else None
 
     @property
     def device_class(self):
@@ -226,6 +350,8 @@ class BeszelTemperatureSensor(BeszelBaseSensor):
 
 
 class BeszelUptimeSensor(BeszelBaseSensor):
+    _system_fields = ("info.u",)
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_uptime"
@@ -243,7 +369,7 @@ class BeszelUptimeSensor(BeszelBaseSensor):
         """Return uptime in minutes (numeric) to preserve existing statistics."""
         if not self.system:
             return None
-        return self.system.info.get("u")
+        return self.system.u
 
     @property
     def native_unit_of_measurement(self):
@@ -264,7 +390,7 @@ class BeszelUptimeSensor(BeszelBaseSensor):
         """
         if not self.system:
             return {}
-        minutes_total = self.system.info.get("u")
+        minutes_total = self.system.u
         if minutes_total is None:
             return {}
 
@@ -284,12 +410,24 @@ class BeszelUptimeSensor(BeszelBaseSensor):
         return {"formatted": formatted}
 
 
-class BeszelEFSDiskSensor(BeszelBaseSensor):
-    def __init__(self, coordinator, system, disk_name, stats_data):
+class _EFSBase(BeszelBaseSensor):
+    """Shared helpers for EFS disk sensors, reading live coordinator data."""
+
+    _stats_fields = ("stats.efs",)
+
+    def __init__(self, coordinator, system, disk_name):
         super().__init__(coordinator, system)
         self._disk_name = disk_name
-        self._stats_data = stats_data
+
+    def _disk(self):
+        return self._system_stats().efs.get(self._disk_name)
 
+    @property
+    def icon(self):
+        return "mdi:harddisk"
+
+
+class BeszelEFSDiskSensor(_EFSBase):
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_efs_{self._disk_name}"
@@ -298,20 +436,14 @@ class BeszelEFSDiskSensor(BeszelBaseSensor):
     def name(self):
         return f"{self.system.name} EFS {self._disk_name}" if self.system else None
 
-    @property
-    def icon(self):
-        return "mdi:harddisk"
-
     @property
     def native_value(self):
-        if not self._stats_data:
+        disk = self._disk()
+        if disk is None:
             return None
 
-        efs_data = self._stats_data.get('efs', {})
-        disk_data = efs_data.get(self._disk_name, {})
-
-        total_space = disk_data.get('d')
-        used_space = disk_data.get('du')
+        total_space = disk.total
+        used_space = disk.used
 
         # Calculate disk usage percentage
         if total_space and used_space and total_space > 0:
@@ -325,61 +457,126 @@ class BeszelEFSDiskSensor(BeszelBaseSensor):
     @property
     def extra_state_attributes(self):
         """Return additional state attributes for the EFS disk."""
-        if not self._stats_data:
+        disk = self._disk()
+        if disk is None:
             return {}
 
-        efs_data = self._stats_data.get('efs', {})
-        disk_data = efs_data.get(self._disk_name, {})
-
         return {
-            "total_disk_space_gb": disk_data.get('d'),
-            "disk_used_gb": disk_data.get('du'),
-            "read_mb_s": disk_data.get('r'),
-            "write_mb_s": disk_data.get('w'),
+            "total_disk_space_gb": disk.total,
+            "disk_used_gb": disk.used,
+            "read_mb_s": disk.read,
+            "write_mb_s": disk.write,
         }
 
 
+class BeszelEFSDiskReadSensor(_EFSBase):
+    @property
+    def unique_id(self):
+        return f"beszel_{self._system_id}_efs_{self._disk_name}_read"
+
+    @property
+    def name(self):
+        return f"{self.system.name} EFS {self._disk_name} Read" if self.system else None
+
+    @property
+    def icon(self):
+        return "mdi:download"
+
+    @property
+    def native_value(self):
+        disk = self._disk()
+        return disk.read if disk else None
+
+    @property
+    def native_unit_of_measurement(self):
+        return "MB/s"
+
+
+class BeszelEFSDiskWriteSensor(_EFSBase):
+    @property
+    def unique_id(self):
+        return f"beszel_{self._system_id}_efs_{self._disk_name}_write"
+
+    @property
+    def name(self):
+        return f"{self.system.name} EFS {self._disk_name} Write" if self.system else None
+
+    @property
+    def icon(self):
+        return "mdi:upload"
+
+    @property
+    def native_value(self):
+        disk = self._disk()
+        return disk.write if disk else None
+
+    @property
+    def native_unit_of_measurement(self):
+        return "MB/s"
+
+
 # ----------------------
 # GPU sensors (NEW)
 # ----------------------
 
+class _KeyResolver:
+    """Remembers which key of a map an entity reads.
+
+    ``resolve`` picks the key from a map; it only runs again when the map's
+    key set differs from the one it was resolved against, so repeated reads
+    of the same schema are a plain dict lookup.
+    """
+
+    __slots__ = ("_resolve", "_keys", "_key")
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+        self._keys = None
+        self._key = None
+
+    def lookup(self, mapping):
+        if self._keys is None or mapping.keys() != self._keys:
+            self._keys = set(mapping)
+            self._key = self._resolve(mapping)
+        return self._key
+
+
 class _GPUBase(BeszelBaseSensor):
     """Shared helpers for GPU sensors."""
 
+    _stats_fields = ("stats.g",)
+
     def __init__(self, coordinator, system, gpu_key, gpu_name):
         super().__init__(coordinator, system)
         self._gpu_key = str(gpu_key)
         self._gpu_name = str(gpu_name or f"GPU {gpu_key}")
+        self._temp_key = _KeyResolver(self._resolve_temp_key)
 
-    def _system_stats(self):
-        all_stats = self.coordinator.data.get("stats", {})
-        return all_stats.get(self._system_id, {}) if isinstance(all_stats, dict) else {}
+    def _gpu(self):
+        return self._system_stats().gpus.get(self._gpu_key)
 
-    def _gpu_vals(self):
-        ss = self._system_stats()
-        gmap = ss.get("g", {})
-        if isinstance(gmap, dict):
-            return gmap.get(self._gpu_key, {}) or {}
-        return {}
+    def _gpu_attr(self, attr):
+        gpu = self._gpu()
+        return getattr(gpu, attr) if gpu is not None else None
 
-    def _gpu_temp_value(self):
-        """Try to find a GPU temp from the flat temp map."""
-        ss = self._system_stats()
-        tmap = ss.get("t", {})
-        if not isinstance(tmap, dict):
-            return None
+    def _resolve_temp_key(self, tmap):
         # Prefer keys that contain 'gpu', otherwise try to match gpu name
         lower_name = self._gpu_name.lower()
         best = None
-        for k, v in tmap.items():
+        for k in tmap:
             kn = str(k).lower()
             if "gpu" in kn:
-                best = v
-                break
+                return k
             if lower_name and lower_name in kn:
-                best = v
+                best = k
         return best
 
+    def _gpu_temp_value(self):
+        """Try to find a GPU temp from the flat temp map."""
+        tmap = self._system_stats().temps
+        key = self._temp_key.lookup(tmap)
+        return tmap.get(key) if key is not None else None
+
     @property
     def name(self):
         sys = self.system
@@ -396,6 +593,8 @@ class _GPUBase(BeszelBaseSensor):
 
 
 class BeszelGPUSensorUsage(_GPUBase):
+    _deadband = 0.5
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_gpu_{self._gpu_key}_usage"
@@ -405,7 +604,7 @@ class BeszelGPUSensorUsage(_GPUBase):
 
     @property
     def native_value(self):
-        return self._gpu_vals().get("u")
+        return self._gpu_attr("usage")
 
     @property
     def native_unit_of_measurement(self):
@@ -426,7 +625,7 @@ class BeszelGPUSensorPower(_GPUBase):
 
     @property
     def native_value(self):
-        return self._gpu_vals().get("p")
+        return self._gpu_attr("power")
 
     @property
     def native_unit_of_measurement(self):
@@ -447,7 +646,7 @@ class BeszelGPUSensorMemUsed(_GPUBase):
 
     @property
     def native_value(self):
-        return self._gpu_vals().get("mu")
+        return self._gpu_attr("mem_used")
 
     @property
     def native_unit_of_measurement(self):
@@ -469,7 +668,7 @@ class BeszelGPUSensorMemTotal(_GPUBase):
 
     @property
     def native_value(self):
-        return self._gpu_vals().get("mt")
+        return self._gpu_attr("mem_total")
 
     @property
     def native_unit_of_measurement(self):
@@ -477,6 +676,8 @@ class BeszelGPUSensorMemTotal(_GPUBase):
 
 
 class BeszelGPUSensorTemp(_GPUBase):
+    _stats_fields = ("stats.g", "stats.t")
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_gpu_{self._gpu_key}_temp"
@@ -501,6 +702,8 @@ class BeszelGPUSensorTemp(_GPUBase):
         return "°C"
 
 class BeszelGPUSensorPowerTile(_GPUBase):
+    _stats_fields = ("stats.g", "stats.power", "stats.pd", "stats.rapl", "stats.pwr")
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_gpu_{self._gpu_key}_power_tile"
@@ -512,31 +715,14 @@ class BeszelGPUSensorPowerTile(_GPUBase):
     def icon(self):
         return "mdi:flash"
 
-    def _power_domains(self):
-        """Return any per-domain power dict if present."""
-        ss = self._system_stats()
-        # Heuristic: some agents expose a top-level power domain map; try common keys.
-        for k in ("power", "pd", "rapl", "pwr"):
-            v = ss.get(k)
-            if isinstance(v, dict):
-                return v
-        return {}
-
     @property
     def native_value(self):
         # 1) Primary: per-GPU map contains tile power as 'p'
-        v = self._gpu_vals().get("p")
-        if isinstance(v, (int, float)):
+        v = self._gpu_attr("power")
+        if v is not None:
             return v
-        # 2) Fallback: scan a power-domain map for GT/GPU-specific keys
-        pd = self._power_domains()
-        for key in pd:
-            k = str(key).lower()
-            if any(s in k for s in ("gpu", "gt", "graphics", "gfx")):
-                val = pd.get(key)
-                if isinstance(val, (int, float)):
-                    return val
-        return None
+        # 2) Fallback: GT/GPU-specific key of a power-domain map
+        return self._system_stats().gpu_domain_power
 
     @property
     def native_unit_of_measurement(self):
@@ -544,6 +730,8 @@ class BeszelGPUSensorPowerTile(_GPUBase):
 
 
 class BeszelGPUSensorPowerPackage(_GPUBase):
+    _stats_fields = ("stats.g", "stats.power", "stats.pd", "stats.rapl", "stats.pwr")
+
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_gpu_{self._gpu_key}_power_package"
@@ -555,31 +743,14 @@ class BeszelGPUSensorPowerPackage(_GPUBase):
     def icon(self):
         return "mdi:cpu-64-bit"
 
-    def _power_domains(self):
-        ss = self._system_stats()
-        for k in ("power", "pd", "rapl", "pwr"):
-            v = ss.get(k)
-            if isinstance(v, dict):
-                return v
-        return {}
-
     @property
     def native_value(self):
-        # Some agents may stash package power next to GPU values (rare); try it:
-        for key in ("pp", "package", "pkg"):
-            v = self._gpu_vals().get(key)
-            if isinstance(v, (int, float)):
-                return v
-
+        # Some agents may stash package power next to GPU values (rare)
+        v = self._gpu_attr("package_power")
+        if v is not None:
+            return v
         # Preferred: a top-level power-domain dict with a package/rapl domain
-        pd = self._power_domains()
-        for key in pd:
-            k = str(key).lower()
-            if any(s in k for s in ("package", "pkg", "rapl_package", "rapl:package")):
-                val = pd.get(key)
-                if isinstance(val, (int, float)):
-                    return val
-        return None
+        return self._system_stats().package_domain_power
 
     @property
     def native_unit_of_measurement(self):
@@ -588,6 +759,8 @@ class BeszelGPUSensorPowerPackage(_GPUBase):
 class _GPUEngineBase(_GPUBase):
     """Shared logic for GPU engine utilization sensors (Render/3D, Blitter, Video, VideoEnhance)."""
 
+    _deadband = 0.5
+
     # Alias map for common Intel engine names from intel_gpu_top / i915:
     _ALIASES = {
         "render": ["render", "rcs", "3d", "gfx", "render3d"],
@@ -599,37 +772,41 @@ class _GPUEngineBase(_GPUBase):
     def __init__(self, coordinator, system, gpu_key, gpu_name, eng_name):
         super().__init__(coordinator, system, gpu_key, gpu_name)
         self._eng_name = eng_name  # one of: render, blitter, video, videoenhance
+        self._engine_key = _KeyResolver(self._resolve_engine_key)
 
-    def _engine_map(self):
-        """Return the engine utilization dict for this GPU, if present."""
-        g = self._gpu_vals()
-        # Try a few likely field names for engine map
-        for k in ("e", "eng", "engines", "ge", "engine_util", "engine"):
-            v = g.get(k)
-            if isinstance(v, dict):
-                return v
-        return {}
-
-    def _find_value(self):
-        emap = self._engine_map()
-        if not emap:
-            return None
+    def _resolve_engine_key(self, emap):
+        aliases = self._ALIASES.get(self._eng_name, [])
         # exact match first
         if self._eng_name in emap and isinstance(emap[self._eng_name], (int, float)):
-            return emap[self._eng_name]
+            return self._eng_name
         # alias match
-        for alias in self._ALIASES.get(self._eng_name, []):
+        for alias in aliases:
             if alias in emap and isinstance(emap[alias], (int, float)):
-                return emap[alias]
+                return alias
         # last resort: scan keys that contain the alias words
         for k, v in emap.items():
             if not isinstance(v, (int, float)):
                 continue
             lk = str(k).lower()
-            if any(alias in lk for alias in self._ALIASES.get(self._eng_name, [])):
-                return v
+            if any(alias in lk for alias in aliases):
+                return k
         return None
 
+    def _engine_map(self):
+        """Return the engine utilization dict for this GPU, if present."""
+        gpu = self._gpu()
+        return gpu.engines if gpu is not None else {}
+
+    def _find_value(self):
+        emap = self._engine_map()
+        if not emap:
+            return None
+        key = self._engine_key.lookup(emap)
+        if key is None:
+            return None
+        v = emap.get(key)
+        return v if isinstance(v, (int, float)) else None
+
     @property
     def native_value(self):
         return self._find_value()
@@ -682,3 +859,435 @@ class BeszelGPUEngineVideoEnhance(_GPUEngineBase):
     @property
     def unique_id(self):
         return f"beszel_{self._system_id}_gpu_{self._gpu_key}_eng_videoenhance"
+
+
+class _ContainerBase(BeszelBaseSensor):
+    """Shared helpers for container sensors, fed by the bulk ``container_stats`` query."""
+
+    def __init__(self, coordinator, system, container_name):
+        super().__init__(coordinator, system)
+        self._container_name = container_name
+
+    def _container(self):
+        return self.coordinator.data["containers"].get(self._system_id, {}).get(self._container_name)
+
+    @property
+    def available(self):
+        # Containers that were removed or stopped reporting are unavailable
+        return super().available and self._container() is not None
+
+    @property
+    def unique_id(self):
+        return f"beszel_{self._system_id}_container_{self._container_name}_{self._key}"
+
+    @property
+    def name(self):
+        sys = self.system
+        if not sys:
+            return None
+        return f"{sys.name} {self._container_name} {self._label()}"
+
+    @property
+    def native_value(self):
+        container = self._container()
+        return getattr(container, self._key) if container is not None else None
+
+    @property
+    def state_class(self):
+        return "measurement"
+
+
+class BeszelContainerCPUSensor(_ContainerBase):
+    _key = "cpu"
+    _deadband = 0.5
+
+    def _label(self):
+        return "CPU"
+
+    @property
+    def icon(self):
+        return "mdi:cpu-64-bit"
+
+    @property
+    def native_unit_of_measurement(self):
+        return "%"
+
+
+class BeszelContainerMemorySensor(_ContainerBase):
+    _key = "mem"
+
+    def _label(self):
+        return "Memory"
+
+    @property
+    def icon(self):
+        return "mdi:memory"
+
+    @property
+    def native_unit_of_measurement(self):
+        return "MB"
+
+
+class BeszelContainerNetSentSensor(_ContainerBase):
+    _key = "net_sent"
+
+    def _label(self):
+        return "Network Sent"
+
+    @property
+    def icon(self):
+        return "mdi:upload-network"
+
+    @property
+    def native_unit_of_measurement(self):
+        return "MB/s"
+
+
+class BeszelContainerNetReceivedSensor(_ContainerBase):
+    _key = "net_recv"
+
+    def _label(self):
+        return "Network Received"
+
+    @property
+    def icon(self):
+        return "mdi:download-network"
+
+    @property
+    def native_unit_of_measurement(self):
+        return "MB/s"
+
+
+CONTAINER_SENSORS = (
+    BeszelContainerCPUSensor,
+    BeszelContainerMemorySensor,
+    BeszelContainerNetSentSensor,
+    BeszelContainerNetReceivedSensor,
+)
+
+
+class _HubSensorBase(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor about the coordinator itself, on a hub device per entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _key = None
+
+    def __init__(self, coordinator, entry):
+        super().__init__(coordinator)
+        self._entry = entry
+
+    @property
+    def _metrics(self):
+        return self.coordinator.metrics
+
+    def _label(self):
+        return "Sensor"
+
+    @property
+    def available(self):
+        # The metrics stay meaningful while the hub is unreachable
+        return True
+
+    @property
+    def unique_id(self):
+        return f"beszel_{self._entry.entry_id}_hub_{self._key}"
+
+    @property
+    def name(self):
+        return f"{self._entry.title} {self._label()}"
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(DOMAIN, self._entry.entry_id)},
+            "name": self._entry.title,
+            "manufacturer": "Beszel",
+            "model": "Hub",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+
+class BeszelHubRefreshTimeSensor(_HubSensorBase):
+    _key = "refresh_time"
+
+    def _label(self):
+        return "Refresh time"
+
+    @property
+    def icon(self):
+        return "mdi:timer-outline"
+
+    @property
+    def native_value(self):
+        # Duration of the last systems refresh; stats refreshes are in the attributes
+        refresh = self._metrics.refresh.get("systems")
+        last = refresh.last if refresh is not None else None
+        return round(last * 1000, 1) if last is not None else None
+
+    @property
+    def native_unit_of_measurement(self):
+        return "ms"
+
+    @property
+    def state_class(self):
+        return "measurement"
+
+    @property
+    def extra_state_attributes(self):
+        attributes = {}
+        for name, histogram in sorted(self._metrics.refresh.items()):
+            refresh = histogram.as_dict()
+            attributes[f"{name}_refreshes"] = refresh["count"]
+            attributes[f"{name}_failed_refreshes"] = self._metrics.refresh_errors.get(name, 0)
+            attributes[f"{name}_last_ms"] = refresh["last_ms"]
+            attributes[f"{name}_p50_ms"] = refresh["p50_ms"]
+            attributes[f"{name}_p95_ms"] = refresh["p95_ms"]
+            attributes[f"{name}_max_ms"] = refresh["max_ms"]
+        return attributes
+
+
+class BeszelHubEntityUpdateTimeSensor(_HubSensorBase):
+    _key = "entity_update_time"
+
+    def _label(self):
+        return "Entity update time"
+
+    @property
+    def icon(self):
+        return "mdi:timer-sand"
+
+    @property
+    def native_value(self):
+        last = self._metrics.entity_updates.last
+        return round(last * 1000, 2) if last is not None else None
+
+    @property
+    def native_unit_of_measurement(self):
+        return "ms"
+
+    @property
+    def state_class(self):
+        return "measurement"
+
+    @property
+    def extra_state_attributes(self):
+        updates = self._metrics.entity_updates.as_dict()
+        return {"p95_ms": updates["p95_ms"], "max_ms": updates["max_ms"]}
+
+
+class BeszelHubRequestsSensor(_HubSensorBase):
+    _key = "requests"
+
+    def _label(self):
+        return "Requests"
+
+    @property
+    def icon(self):
+        return "mdi:swap-horizontal"
+
+    @property
+    def native_value(self):
+        return self._metrics.requests
+
+    @property
+    def state_class(self):
+        return "total_increasing"
+
+    @property
+    def extra_state_attributes(self):
+        return {call: histogram.count for call, histogram in self._metrics.calls.items()}
+
+
+class BeszelHubErrorsSensor(_HubSensorBase):
+    _key = "errors"
+
+    def _label(self):
+        return "Request errors"
+
+    @property
+    def icon(self):
+        return "mdi:alert-circle-outline"
+
+    @property
+    def native_value(self):
+        return self._metrics.request_errors
+
+    @property
+    def state_class(self):
+        return "total_increasing"
+
+    @property
+    def extra_state_attributes(self):
+        return dict(self._metrics.call_errors)
+
+
+class BeszelHubDataReceivedSensor(_HubSensorBase):
+    _key = "data_received"
+
+    def _label(self):
+        return "Data received"
+
+    @property
+    def icon(self):
+        return "mdi:download-network"
+
+    @property
+    def native_value(self):
+        return round(self._metrics.bytes_received / 1024, 1)
+
+    @property
+    def native_unit_of_measurement(self):
+        return "KiB"
+
+    @property
+    def device_class(self):
+        return "data_size"
+
+    @property
+    def state_class(self):
+        return "total_increasing"
+
+
+class BeszelHubStalestSystemSensor(_HubSensorBase):
+    """System whose newest stats are the oldest: an agent lagging or no longer reporting."""
+
+    _key = "stalest_system"
+
+    def _label(self):
+        return "Stalest system"
+
+    @property
+    def icon(self):
+        return "mdi:clock-alert-outline"
+
+    def _named(self):
+        systems = self.coordinator.data["systems"] if self.coordinator.data else {}
+        return [
+            (systems[system_id].name if system_id in systems else system_id, seconds)
+            for system_id, seconds in self._metrics.stalest_systems()
+        ]
+
+    @property
+    def native_value(self):
+        stalest = self._named()
+        return stalest[0][0] if stalest else None
+
+    @property
+    def extra_state_attributes(self):
+        # Name -> age of its newest stats, in seconds
+        return {name: round(seconds) for name, seconds in self._named()}
+
+
+HUB_SENSORS = (
+    BeszelHubRefreshTimeSensor,
+    BeszelHubEntityUpdateTimeSensor,
+    BeszelHubRequestsSensor,
+    BeszelHubErrorsSensor,
+    BeszelHubDataReceivedSensor,
+    BeszelHubStalestSystemSensor,
+)
+
+
+class _FleetSensorBase(_HubSensorBase):
+    """Aggregate over a group of systems, read from the coordinator's fleet summary."""
+
+    # Regular sensors that replace template sensors, not diagnostics
+    _attr_entity_category = None
+    _attr_entity_registry_enabled_default = True
+
+    def __init__(self, coordinator, entry, group):
+        super().__init__(coordinator, entry)
+        self._group = group
+
+    def _fleet(self):
+        data = self.coordinator.data
+        return data["fleet"].get(self._group) if data and "fleet" in data else None
+
+    def _label(self):
+        if self._group == FLEET_ALL:
+            return f"Fleet {self._metric_label()}"
+        name = self.coordinator.fleet_groups[self._group][0]
+        return f"Fleet {name} {self._metric_label()}"
+
+    def _metric_label(self):
+        return "Sensor"
+
+    @property
+    def available(self):
+        return self.coordinator.last_update_success and self._fleet() is not None
+
+
+class BeszelFleetSensor(_FleetSensorBase):
+    """Numeric fleet aggregate, one per entry of ``FLEET_SENSORS``."""
+
+    def __init__(self, coordinator, entry, group, key, label, unit, icon, state_class):
+        super().__init__(coordinator, entry, group)
+        self._field = key
+        self._metric = label
+        self._unit = unit
+        self._icon = icon
+        self._state_class = state_class
+
+    @property
+    def unique_id(self):
+        return f"beszel_{self._entry.entry_id}_fleet_{self._group}_{self._field}"
+
+    def _metric_label(self):
+        return self._metric
+
+    @property
+    def icon(self):
+        return self._icon
+
+    @property
+    def native_value(self):
+        fleet = self._fleet()
+        return getattr(fleet, self._field) if fleet else None
+
+    @property
+    def native_unit_of_measurement(self):
+        return self._unit
+
+    @property
+    def state_class(self):
+        return self._state_class
+
+
+class BeszelFleetHottestSensor(_FleetSensorBase):
+    @property
+    def unique_id(self):
+        return f"beszel_{self._entry.entry_id}_fleet_{self._group}_hottest_host"
+
+    def _metric_label(self):
+        return "hottest host"
+
+    @property
+    def icon(self):
+        return "mdi:thermometer-alert"
+
+    @property
+    def native_value(self):
+        fleet = self._fleet()
+        return fleet.hottest_host if fleet else None
+
+    @property
+    def extra_state_attributes(self):
+        fleet = self._fleet()
+        return {"temperature": fleet.hottest_temp} if fleet else {}
+
+
+# (summary field, label, unit, icon, state class)
+FLEET_SENSORS = (
+    ("hosts", "hosts", None, "mdi:server-network", "measurement"),
+    ("up", "hosts up", None, "mdi:server-network", "measurement"),
+    ("down", "hosts down", None, "mdi:server-network-off", "measurement"),
+    ("cpu_mean", "CPU mean", "%", "mdi:cpu-64-bit", "measurement"),
+    ("cpu_max", "CPU max", "%", "mdi:cpu-64-bit", "measurement"),
+    ("ram_mean", "RAM mean", "%", "mdi:memory", "measurement"),
+    ("ram_max", "RAM max", "%", "mdi:memory", "measurement"),
+    ("disk_mean", "disk mean", "%", "mdi:harddisk", "measurement"),
+    ("disk_max", "disk max", "%", "mdi:harddisk", "measurement"),
+    ("bandwidth", "bandwidth", "MB/s", "mdi:network", "measurement"),
+    ("gpu_power", "GPU power", "W", "mdi:flash", "measurement"),
+)